@@ -0,0 +1,247 @@
+# benchmarks/renderizacao.py
+#
+# Benchmark das páginas: cada página é executada com streamlit.testing.v1.AppTest
+# contra um banco local com dados (python -m ferramentas.gerar_dados --ano 2090)
+# e, a cada execução ou ação (selecionar um ano, abrir um painel, clicar em
+# "Próxima", iniciar ou resetar uma votação), são medidos o tempo, o número de
+# comandos enviados ao banco, as conexões emprestadas do pool e as conexões que o
+# banco tem abertas (pg_stat_activity, lidas por uma conexão à parte).
+#
+# Uso:
+#   python -m benchmarks.renderizacao --ano 2090            # compara com benchmarks/baselines/
+#   python -m benchmarks.renderizacao --ano 2090 --salvar   # grava os resultados como novas baselines
+#   python -m benchmarks.renderizacao --cenario classificacao
+#
+# A comparação falha (código de saída 1) quando um passo faz mais consultas do
+# que a baseline ou fica mais lento do que a tolerância permite. As baselines só
+# valem para o mesmo volume de dados: gere-as com os mesmos parâmetros do gerador.
+#
+# O cenário controle_votacao_acoes grava no ano gerado (inicia, bloqueia, adiciona
+# jurado, reseta). Gere o ano de novo (--substituir) antes de cada execução dele.
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+import streamlit as st
+from dotenv import load_dotenv
+from streamlit.testing.v1 import AppTest
+
+RAIZ = Path(__file__).resolve().parent.parent
+PASTA_BASELINES = Path(__file__).resolve().parent / "baselines"
+
+# A página roda como um script à parte: o AppTest não enxerga o sys.path do benchmark
+SCRIPT = """
+import sys
+sys.path.insert(0, {raiz!r})
+from paginas import {pagina}
+{pagina}.show()
+"""
+
+
+# ---- Ações sobre a página; devolvem False quando o widget não existe ----
+
+def selecionar(rotulo_prefixo, valor=None, posicao=None):
+    def acao(at):
+        for caixa in at.selectbox:
+            if caixa.label.startswith(rotulo_prefixo):
+                if valor is not None and str(valor) in caixa.options:
+                    caixa.select(valor)
+                    return True
+                if posicao is not None and len(caixa.options) > posicao:
+                    caixa.select_index(posicao)
+                    return True
+        return False
+    return acao
+
+
+def ligar(chave_prefixo):
+    def acao(at):
+        for toggle in at.toggle:
+            if toggle.key and toggle.key.startswith(chave_prefixo):
+                toggle.set_value(True)
+                return True
+        return False
+    return acao
+
+
+def clicar(chave_prefixo, exceto=None):
+    def acao(at):
+        for botao in at.button:
+            if exceto and botao.key == exceto:
+                continue
+            if botao.key and botao.key.startswith(chave_prefixo) and not botao.disabled:
+                botao.click()
+                return True
+        return False
+    return acao
+
+
+def reexecutar(at):
+    return True
+
+
+# Cenários: página e sequência de passos (nome, ação). O primeiro passo sempre é a
+# primeira execução, com os caches do Streamlit vazios.
+def cenarios(ano):
+    return {
+        "controle_votacao": ("controle_votacao", [
+            ("selecionar_ano", selecionar("Selecione o Ano", ano)),
+            ("reexecutar", reexecutar),
+            ("abrir_painel", ligar("detalhes_")),
+            ("proxima_pagina_jurados", clicar("proxima_notas_")),
+        ]),
+        # Ações do operador sobre a primeira equipe: cada uma recarrega só o painel dela
+        "controle_votacao_acoes": ("controle_votacao", [
+            ("selecionar_ano", selecionar("Selecione o Ano", ano)),
+            ("iniciar_todas", clicar("iniciar_todas")),
+            ("abrir_painel", ligar("detalhes_")),
+            ("bloquear_liberar", clicar("botao_bloquear_")),
+            ("adicionar_jurado", clicar("add_jurado_")),
+            ("resetar_votacao", clicar("resetar_")),
+            ("iniciar_votacao", clicar("iniciar_", exceto="iniciar_todas")),
+        ]),
+        "classificacao": ("classificacao", [
+            ("selecionar_ano", selecionar("Selecione o ano", ano)),
+            ("reexecutar", reexecutar),
+            ("trocar_modalidade", selecionar("Selecione a modalidade", posicao=1)),
+        ]),
+        "cadastro_equipe": ("cadastro_equipe", [
+            ("selecionar_ano", selecionar("Selecione o ano", ano)),
+            ("proxima_pagina", clicar("proxima_")),
+            ("reexecutar", reexecutar),
+        ]),
+        "cadastro_participante": ("cadastro_participante", [
+            ("selecionar_ano", selecionar("Selecione o ano", ano)),
+            ("reexecutar", reexecutar),
+        ]),
+        "cadastro_jurado": ("cadastro_jurado", [
+            ("selecionar_ano", selecionar("Selecione o ano", ano)),
+            ("reexecutar", reexecutar),
+        ]),
+        "cadastro_ano": ("cadastro_ano", [
+            ("reexecutar", reexecutar),
+        ]),
+    }
+
+
+# Conexões abertas no banco, sem contar a do próprio monitor
+def conexoes_no_banco(monitor):
+    with monitor.cursor() as cursor:
+        cursor.execute("""
+            SELECT count(*)
+            FROM pg_stat_activity
+            WHERE datname = current_database() AND pid <> pg_backend_pid();
+        """)
+        return cursor.fetchone()[0]
+
+
+# Executa at.run() medindo tempo, comandos, empréstimos do pool e conexões abertas no banco
+def medir(at, db, monitor):
+    antes = db.contadores()
+    inicio = time.perf_counter()
+    at.run()
+    tempo = time.perf_counter() - inicio
+    depois = db.contadores()
+    return {
+        "tempo_ms": round(tempo * 1000, 1),
+        "consultas": depois["consultas"] - antes["consultas"],
+        "emprestimos": depois["emprestimos"] - antes["emprestimos"],
+        "conexoes": conexoes_no_banco(monitor),
+        "erros": [str(e.value) for e in at.exception] + [e.value for e in at.error],
+    }
+
+
+def executar_cenario(pagina, passos, timeout):
+    from paginas import db
+
+    st.cache_data.clear()
+    # Conexão fora do pool do app: as consultas do monitor não entram na contagem
+    monitor = psycopg2.connect(db.DB_URL)
+    monitor.autocommit = True
+    try:
+        at = AppTest.from_string(SCRIPT.format(raiz=str(RAIZ), pagina=pagina), default_timeout=timeout)
+        resultados = [{"passo": "primeira_execucao", **medir(at, db, monitor)}]
+        for nome, acao in passos:
+            if not acao(at):
+                resultados.append({"passo": nome, "ignorado": True})
+                continue
+            resultados.append({"passo": nome, **medir(at, db, monitor)})
+    finally:
+        monitor.close()
+    return resultados
+
+
+# Compara com a baseline: mais consultas que antes, ou tempo acima da tolerância, é regressão
+def comparar(nome, resultados, baseline, tolerancia):
+    anteriores = {p["passo"]: p for p in baseline.get("passos", [])}
+    regressoes = []
+    for passo in resultados:
+        anterior = anteriores.get(passo["passo"])
+        if passo.get("ignorado") or not anterior or anterior.get("ignorado"):
+            continue
+        if passo["consultas"] > anterior["consultas"]:
+            regressoes.append(f"{nome}/{passo['passo']}: {anterior['consultas']} -> {passo['consultas']} consultas")
+        limite = anterior["tempo_ms"] * (1 + tolerancia)
+        if passo["tempo_ms"] > limite:
+            regressoes.append(f"{nome}/{passo['passo']}: {anterior['tempo_ms']} -> {passo['tempo_ms']} ms")
+    return regressoes
+
+
+def imprimir(nome, resultados):
+    print(f"\n{nome}")
+    print(f"  {'passo':<26} {'tempo ms':>9} {'consultas':>10} {'empréstimos':>12} {'conexões':>9}")
+    for passo in resultados:
+        if passo.get("ignorado"):
+            print(f"  {passo['passo']:<26} {'(ignorado: widget não encontrado)':>42}")
+            continue
+        print(f"  {passo['passo']:<26} {passo['tempo_ms']:>9.1f} {passo['consultas']:>10} "
+              f"{passo['emprestimos']:>12} {passo['conexoes']:>9}")
+        for erro in passo["erros"]:
+            print(f"    erro: {erro}")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Benchmark das páginas com AppTest.")
+    parser.add_argument("--ano", type=int, default=2090, help="ano com os dados gerados (padrão: 2090)")
+    parser.add_argument("--cenario", action="append", help="executa só este cenário (pode repetir)")
+    parser.add_argument("--salvar", action="store_true", help="grava os resultados como baselines")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento de tempo aceito (padrão: 0.25 = 25%%)")
+    parser.add_argument("--timeout", type=float, default=30, help="segundos por execução da página")
+    args = parser.parse_args()
+
+    todos = cenarios(args.ano)
+    escolhidos = args.cenario or list(todos)
+    desconhecidos = [c for c in escolhidos if c not in todos]
+    if desconhecidos:
+        sys.exit(f"Cenários desconhecidos: {', '.join(desconhecidos)}. Disponíveis: {', '.join(todos)}.")
+
+    regressoes = []
+    for nome in escolhidos:
+        pagina, passos = todos[nome]
+        resultados = executar_cenario(pagina, passos, args.timeout)
+        imprimir(nome, resultados)
+
+        arquivo = PASTA_BASELINES / f"{nome}.json"
+        if args.salvar:
+            PASTA_BASELINES.mkdir(exist_ok=True)
+            arquivo.write_text(json.dumps({"ano": args.ano, "passos": resultados}, indent=2, ensure_ascii=False) + "\n",
+                               encoding="utf-8")
+        elif arquivo.exists():
+            regressoes += comparar(nome, resultados, json.loads(arquivo.read_text(encoding="utf-8")), args.tolerancia)
+
+    if args.salvar:
+        print(f"\nBaselines gravadas em {PASTA_BASELINES}.")
+    elif regressoes:
+        print("\nRegressões em relação às baselines:")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# ferramentas/carga.py
+#
+# Teste de carga do banco: várias sessões simultâneas repetindo as consultas
+# das páginas Controle das Votações e Classificação sobre um ano (de preferência
+# gerado com ferramentas.gerar_dados). Ao final mostra, por consulta, os
+# percentis de latência e, durante a execução, quantas conexões o banco tinha.
+#
+# Uso:
+#   python -m ferramentas.carga --ano 2090
+#   python -m ferramentas.carga --ano 2090 --sessoes 30 --conexoes 10 --duracao 60
+#
+# As consultas abaixo são cópias das usadas em paginas/controle_votacao.py e
+# paginas/classificacao.py; quando uma delas mudar na página, atualize aqui. A
+# nota final vem de paginas/nota_final.py, a mesma usada pela página.
+# Só leitura: nada é gravado no banco.
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2 import pool
+
+from paginas import nota_final
+
+JURADOS_POR_PAGINA = 10
+EQUIPES_POR_PAINEL = 8
+
+CONSULTAS = {
+    # controle_votacao.carregar_equipes
+    "controle.equipes": """
+        SELECT id_equipe, nome, ordem_apresentacao, status_votacao
+        FROM tbl_equipes
+        WHERE id_modalidade = %(modalidade)s AND LOWER(grau) = LOWER(%(grau)s)
+        ORDER BY ordem_apresentacao;
+    """,
+    # controle_votacao.carregar_participantes
+    "controle.participantes": """
+        SELECT p.id_equipe, array_agg(p.nome ORDER BY p.nome), array_agg(p.turma ORDER BY p.nome)
+        FROM tbl_participantes p
+        WHERE p.id_equipe = ANY(%(equipes)s)
+        GROUP BY p.id_equipe;
+    """,
+    # controle_votacao.carregar_notas (primeira página de jurados de cada equipe)
+    "controle.notas": """
+        WITH cursores AS (
+            SELECT *
+            FROM unnest(%(equipes)s::int[], %(nomes_apos)s::text[], %(jurados_apos)s::int[])
+                AS c(id_equipe, nome_apos, id_jurado_apos)
+        ),
+        jurados_pagina AS (
+            SELECT id_equipe, id_jurado
+            FROM (
+                SELECT
+                    ej.id_equipe,
+                    ej.id_jurado,
+                    ROW_NUMBER() OVER (PARTITION BY ej.id_equipe ORDER BY j.nome, ej.id_jurado) AS posicao
+                FROM (
+                    SELECT DISTINCT id_equipe, id_jurado
+                    FROM tbl_notas
+                    WHERE id_equipe = ANY(%(equipes)s)
+                ) ej
+                JOIN cursores cu ON cu.id_equipe = ej.id_equipe
+                JOIN tbl_jurados j ON j.id_jurado = ej.id_jurado
+                WHERE cu.nome_apos IS NULL
+                   OR (j.nome, ej.id_jurado) > (cu.nome_apos, cu.id_jurado_apos)
+            ) numerados
+            WHERE posicao <= %(limite)s
+        )
+        SELECT n.id_equipe, j.id_jurado, j.nome, n.status, c.nome,
+               CASE WHEN e.id_jurado IS NOT NULL THEN 'Sim' ELSE 'Não' END, n.nota
+        FROM tbl_notas n
+        JOIN jurados_pagina jp ON jp.id_equipe = n.id_equipe AND jp.id_jurado = n.id_jurado
+        JOIN tbl_jurados j ON n.id_jurado = j.id_jurado
+        JOIN tbl_criterios c ON n.id_criterio = c.id_criterio
+        LEFT JOIN tbl_especialistas e
+            ON j.id_jurado = e.id_jurado AND c.id_modalidade = e.id_modalidade AND e.id_ano = n.id_ano
+        ORDER BY n.id_equipe, j.nome, j.id_jurado, c.nome;
+    """,
+    # classificacao.carregar_versao
+    "classificacao.versao": """
+        SELECT versao, versao_classificacao
+        FROM tbl_notas_versao
+        WHERE id_ano = %(ano)s AND id_modalidade = %(modalidade)s;
+    """,
+    # classificacao.calcular_notas_finais
+    "classificacao.notas_finais": nota_final.QUERY_MODALIDADE,
+    # classificacao.carregar_participantes_por_modalidade
+    "classificacao.participantes": """
+        SELECT p.id_equipe, array_agg(p.nome ORDER BY p.nome)
+        FROM tbl_participantes p
+        JOIN tbl_equipes eq ON eq.id_equipe = p.id_equipe
+        WHERE eq.id_modalidade = %(modalidade)s
+        GROUP BY p.id_equipe;
+    """,
+}
+
+# Sequência de consultas de uma visita a cada página
+VISITAS = {
+    "controle_votacao": ["controle.equipes", "controle.participantes", "controle.notas"],
+    "classificacao": ["classificacao.versao", "classificacao.notas_finais", "classificacao.participantes"],
+}
+
+
+# Modalidades do ano e as equipes de cada (modalidade, grau)
+def carregar_contexto(db_url, ano):
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT m.id_modalidade, e.grau, array_agg(e.id_equipe ORDER BY e.ordem_apresentacao)
+                FROM tbl_modalidades m
+                JOIN tbl_equipes e ON e.id_modalidade = m.id_modalidade
+                WHERE m.id_ano = %s
+                GROUP BY m.id_modalidade, e.grau;
+            """, (ano,))
+            return [{"modalidade": m, "grau": g, "equipes": equipes} for m, g, equipes in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+# Mais sessões do que conexões: quem não encontra vaga espera, como o semáforo de paginas/db.py
+class PoolLimitado(pool.ThreadedConnectionPool):
+    def __init__(self, maxconn, *args, **kwargs):
+        self._vagas = threading.BoundedSemaphore(maxconn)
+        super().__init__(1, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        self._vagas.acquire()
+        try:
+            return super().getconn(key)
+        except Exception:
+            self._vagas.release()
+            raise
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._vagas.release()
+
+
+class Resultados:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.erros = defaultdict(int)
+
+    def registrar(self, consulta, segundos):
+        with self._lock:
+            self.latencias[consulta].append(segundos)
+
+    def registrar_erro(self, consulta):
+        with self._lock:
+            self.erros[consulta] += 1
+
+
+# Uma sessão: visitas aleatórias às páginas, cada consulta com uma conexão emprestada do pool,
+# como faz paginas/db.py
+def sessao(pool_conexoes, contexto, ano, fim, pausa, resultados, semente):
+    rng = random.Random(semente)
+    while time.monotonic() < fim:
+        alvo = rng.choice(contexto)
+        inicio_painel = rng.randrange(max(len(alvo["equipes"]) - EQUIPES_POR_PAINEL, 0) + 1)
+        equipes = alvo["equipes"][inicio_painel:inicio_painel + EQUIPES_POR_PAINEL]
+        params = {
+            "ano": ano,
+            "modalidade": alvo["modalidade"],
+            "grau": alvo["grau"],
+            "equipes": equipes,
+            # Todas as equipes na primeira página de jurados
+            "nomes_apos": [None] * len(equipes),
+            "jurados_apos": [None] * len(equipes),
+            "limite": JURADOS_POR_PAGINA + 1,
+        }
+        for consulta in VISITAS[rng.choice(list(VISITAS))]:
+            inicio = time.perf_counter()
+            try:
+                conn = pool_conexoes.getconn()
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(CONSULTAS[consulta], params)
+                        cursor.fetchall()
+                    conn.rollback()
+                finally:
+                    pool_conexoes.putconn(conn)
+            except Exception:
+                resultados.registrar_erro(consulta)
+                continue
+            resultados.registrar(consulta, time.perf_counter() - inicio)
+        time.sleep(rng.uniform(0, pausa))
+
+
+# Conta as conexões do banco (todas e as ativas) enquanto o teste roda
+def monitorar_conexoes(db_url, fim, amostras):
+    conn = psycopg2.connect(db_url)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            while time.monotonic() < fim:
+                cursor.execute("""
+                    SELECT count(*), count(*) FILTER (WHERE state = 'active')
+                    FROM pg_stat_activity
+                    WHERE datname = current_database() AND pid <> pg_backend_pid();
+                """)
+                amostras.append(cursor.fetchone())
+                time.sleep(0.5)
+    finally:
+        conn.close()
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p / 100), len(ordenados) - 1)]
+
+
+def relatorio(resultados, amostras, duracao):
+    print(f"{'consulta':<30} {'qtd':>7} {'erros':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+    total = 0
+    for consulta in CONSULTAS:
+        valores = resultados.latencias.get(consulta, [])
+        erros = resultados.erros.get(consulta, 0)
+        total += len(valores)
+        if not valores:
+            print(f"{consulta:<30} {0:>7} {erros:>6}")
+            continue
+        p50, p95, p99 = (percentil(valores, p) * 1000 for p in (50, 95, 99))
+        print(f"{consulta:<30} {len(valores):>7} {erros:>6} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {max(valores) * 1000:>9.1f}")
+    print(f"\n{total} consultas em {duracao:.0f}s ({total / duracao:.1f}/s)")
+    if amostras:
+        conexoes = [a[0] for a in amostras]
+        ativas = [a[1] for a in amostras]
+        print(f"Conexões no banco: média {sum(conexoes) / len(conexoes):.1f}, máximo {max(conexoes)}; "
+              f"ativas: média {sum(ativas) / len(ativas):.1f}, máximo {max(ativas)}")
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Teste de carga das consultas de votação e classificação.")
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"), help="URL do banco (padrão: DB_URL do .env)")
+    parser.add_argument("--ano", type=int, default=2090, help="ano consultado (padrão: 2090)")
+    parser.add_argument("--sessoes", type=int, default=20, help="sessões simultâneas")
+    parser.add_argument("--conexoes", type=int, default=int(os.getenv("DB_POOL_MAX", "10")),
+                        help="tamanho do pool compartilhado (padrão: DB_POOL_MAX)")
+    parser.add_argument("--duracao", type=float, default=30, help="segundos de teste")
+    parser.add_argument("--pausa", type=float, default=0.5, help="pausa máxima entre visitas de uma sessão, em segundos")
+    args = parser.parse_args()
+
+    if not args.db_url:
+        sys.exit("DB_URL não definida. Use --db-url ou configure o .env.")
+
+    contexto = carregar_contexto(args.db_url, args.ano)
+    if not contexto:
+        sys.exit(f"O ano {args.ano} não tem equipes. Gere dados com: python -m ferramentas.gerar_dados --ano {args.ano}")
+
+    pool_conexoes = PoolLimitado(args.conexoes, args.db_url)
+    resultados = Resultados()
+    amostras = []
+    fim = time.monotonic() + args.duracao
+
+    threads = [threading.Thread(target=monitorar_conexoes, args=(args.db_url, fim, amostras), daemon=True)]
+    threads += [
+        threading.Thread(target=sessao, args=(pool_conexoes, contexto, args.ano, fim, args.pausa, resultados, i), daemon=True)
+        for i in range(args.sessoes)
+    ]
+    print(f"{args.sessoes} sessões, pool de {args.conexoes} conexões, {args.duracao:.0f}s...")
+    inicio = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool_conexoes.closeall()
+
+    relatorio(resultados, amostras, time.monotonic() - inicio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# ferramentas/gerar_dados.py
+#
+# Preenche um banco local com um festival sintético, para medir as páginas com
+# volume realista: modalidades, critérios, jurados, especialistas, equipes,
+# participantes e notas (equipes já votadas, em votação e aguardando).
+#
+# Uso:
+#   python -m ferramentas.gerar_dados --ano 2090
+#   python -m ferramentas.gerar_dados --ano 2090 --equipes 400 --jurados 80 --substituir
+#
+# As tabelas precisam existir (python -m ferramentas.migrar). Os dados usam um
+# ano próprio; --substituir apaga esse ano antes (ON DELETE CASCADE limpa o resto).
+# Nunca rode contra o banco de produção.
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import execute_values
+
+GRAUS = ["Ensino Fundamental", "Ensino Médio"]
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Mateus", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago", "Valentina", "Yuri"]
+SOBRENOMES = ["Almeida", "Barbosa", "Cardoso", "Dias", "Ferreira", "Gomes", "Lima", "Martins", "Nunes",
+              "Oliveira", "Pereira", "Ribeiro", "Santos", "Souza", "Teixeira"]
+
+
+def nome_pessoa(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+# Insere as linhas e devolve os ids gerados, na mesma ordem
+def inserir(cursor, query, linhas):
+    return [row[0] for row in execute_values(cursor, query, linhas, page_size=1000, fetch=True)]
+
+
+# COPY de uma lista de tuplas (valores None viram NULL)
+def copiar(cursor, tabela, colunas, linhas):
+    buffer = io.StringIO()
+    for linha in linhas:
+        buffer.write("\t".join("\\N" if v is None else str(v) for v in linha) + "\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN", buffer)
+
+
+def gerar(conn, args):
+    rng = random.Random(args.semente)
+    ano = args.ano
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM tbl_anos WHERE id_ano = %s;", (ano,))
+        if cursor.fetchone():
+            if not args.substituir:
+                sys.exit(f"O ano {ano} já existe. Use --substituir para apagá-lo e gerar de novo.")
+            cursor.execute("DELETE FROM tbl_anos WHERE id_ano = %s;", (ano,))
+        cursor.execute("INSERT INTO tbl_anos (id_ano) VALUES (%s);", (ano,))
+
+        modalidades = inserir(
+            cursor,
+            "INSERT INTO tbl_modalidades (nome, id_ano) VALUES %s RETURNING id_modalidade",
+            [(f"Modalidade {i + 1}", ano) for i in range(args.modalidades)],
+        )
+        criterios = {}
+        for id_modalidade in modalidades:
+            criterios[id_modalidade] = inserir(
+                cursor,
+                "INSERT INTO tbl_criterios (nome, id_modalidade) VALUES %s RETURNING id_criterio",
+                [(f"Critério {i + 1}", id_modalidade) for i in range(args.criterios)],
+            )
+        jurados = inserir(
+            cursor,
+            "INSERT INTO tbl_jurados (nome, login, senha, id_ano) VALUES %s RETURNING id_jurado",
+            [(nome_pessoa(rng), f"jurado{i + 1}_{ano}", "senha", ano) for i in range(args.jurados)],
+        )
+        especialistas = {}
+        for id_modalidade in modalidades:
+            especialistas[id_modalidade] = rng.sample(jurados, min(args.especialistas, len(jurados)))
+        execute_values(
+            cursor,
+            "INSERT INTO tbl_especialistas (id_ano, id_jurado, id_modalidade) VALUES %s",
+            [(ano, j, m) for m, js in especialistas.items() for j in js],
+            page_size=1000,
+        )
+
+        equipes = []  # (id_equipe, id_modalidade)
+        for id_modalidade in modalidades:
+            linhas = [
+                (f"Equipe {i + 1}", i + 1, id_modalidade, rng.choice(GRAUS), f"Ficha técnica da equipe {i + 1}. " * rng.randint(1, 20))
+                for i in range(args.equipes // len(modalidades))
+            ]
+            ids = inserir(
+                cursor,
+                "INSERT INTO tbl_equipes (nome, ordem_apresentacao, id_modalidade, grau, ficha_tecnica) VALUES %s RETURNING id_equipe",
+                linhas,
+            )
+            equipes.extend((id_equipe, id_modalidade) for id_equipe in ids)
+
+        participantes = []
+        for id_equipe, _ in equipes:
+            nomes = {nome_pessoa(rng) for _ in range(args.participantes)}
+            participantes.extend((nome, f"{rng.randint(6, 9)}º {rng.choice('ABCD')}", id_equipe) for nome in nomes)
+        copiar(cursor, "tbl_participantes", ["nome", "turma", "id_equipe"], participantes)
+
+        # Cada equipe sorteia uma situação: votação encerrada (todas as notas 'ok'),
+        # em andamento (parte dos jurados já votou) ou aguardando (sem cédulas)
+        notas = []
+        votando = []
+        for id_equipe, id_modalidade in equipes:
+            sorteio = rng.random()
+            if sorteio >= args.votadas + args.parciais:
+                continue
+            votando.append(id_equipe)
+            completa = sorteio < args.votadas
+            for id_jurado in rng.sample(jurados, min(args.jurados_por_equipe, len(jurados))):
+                votou = completa or rng.random() < 0.5
+                for id_criterio in criterios[id_modalidade]:
+                    if votou:
+                        notas.append(("ok", round(rng.uniform(5, 10), 2), ano, id_modalidade, id_equipe, id_jurado, id_criterio))
+                    else:
+                        notas.append(("liberado", None, ano, id_modalidade, id_equipe, id_jurado, id_criterio))
+        copiar(cursor, "tbl_notas", ["status", "nota", "id_ano", "id_modalidade", "id_equipe", "id_jurado", "id_criterio"], notas)
+        cursor.execute("UPDATE tbl_equipes SET status_votacao = 'votando' WHERE id_equipe = ANY(%s);", (votando,))
+        cursor.execute("ANALYZE tbl_equipes, tbl_participantes, tbl_notas;")
+
+    return {
+        "modalidades": len(modalidades),
+        "criterios": sum(len(c) for c in criterios.values()),
+        "jurados": len(jurados),
+        "especialistas": sum(len(e) for e in especialistas.values()),
+        "equipes": len(equipes),
+        "participantes": len(participantes),
+        "notas": len(notas),
+    }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Gera um festival sintético para testes de carga.")
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"), help="URL do banco (padrão: DB_URL do .env)")
+    parser.add_argument("--ano", type=int, default=2090, help="ano onde os dados são gerados (padrão: 2090)")
+    parser.add_argument("--modalidades", type=int, default=6)
+    parser.add_argument("--criterios", type=int, default=5, help="critérios por modalidade")
+    parser.add_argument("--jurados", type=int, default=60)
+    parser.add_argument("--especialistas", type=int, default=3, help="especialistas por modalidade")
+    parser.add_argument("--equipes", type=int, default=300, help="total de equipes, divididas entre as modalidades")
+    parser.add_argument("--participantes", type=int, default=12, help="participantes por equipe")
+    parser.add_argument("--jurados-por-equipe", type=int, default=25)
+    parser.add_argument("--votadas", type=float, default=0.4, help="fração das equipes com votação encerrada")
+    parser.add_argument("--parciais", type=float, default=0.3, help="fração das equipes com votação em andamento")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--substituir", action="store_true", help="apaga o ano antes de gerar")
+    args = parser.parse_args()
+
+    if not args.db_url:
+        sys.exit("DB_URL não definida. Use --db-url ou configure o .env.")
+    if args.modalidades < 1 or args.equipes < args.modalidades:
+        sys.exit("Informe ao menos uma modalidade e uma equipe por modalidade.")
+
+    inicio = time.perf_counter()
+    conn = psycopg2.connect(args.db_url)
+    try:
+        totais = gerar(conn, args)
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"Ano {args.ano} gerado em {time.perf_counter() - inicio:.1f}s:")
+    for tabela, total in totais.items():
+        print(f"  {tabela}: {total}")
+
+
+if __name__ == "__main__":
+    main()
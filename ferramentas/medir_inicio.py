@@ -0,0 +1,90 @@
+# ferramentas/medir_inicio.py
+#
+# Mede o tempo até a primeira renderização do app: em um interpretador novo,
+# executa main.py uma vez com streamlit.testing.v1.AppTest (a Página Inicial,
+# como um operador que acabou de abrir o app) e informa quanto demorou e quais
+# bibliotecas pesadas foram importadas nesse caminho.
+#
+# Uso:
+#   python -m ferramentas.medir_inicio                    # mede a árvore atual
+#   python -m ferramentas.medir_inicio --comparar HEAD~1  # antes (outro commit) e depois
+#
+# Com --comparar, o commit indicado é extraído em um git worktree temporário e
+# medido da mesma forma. O import do próprio Streamlit fica fora da medida.
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Nenhuma deve aparecer na Página Inicial (o Pympler só é usado pela página Memória)
+BIBLIOTECAS_PESADAS = ["pandas", "numpy", "psycopg2", "pyarrow", "pympler"]
+
+# Executado em um processo novo, com a pasta do app como diretório atual
+MEDICAO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+antes = set(sys.modules)
+inicio = time.perf_counter()
+at = AppTest.from_file("main.py", default_timeout=120)
+at.run()
+tempo = time.perf_counter() - inicio
+novos = set(sys.modules) - antes
+print(json.dumps({{
+    "tempo_ms": tempo * 1000,
+    "erros": [str(e.value) for e in at.exception],
+    "importadas": sorted(b for b in {bibliotecas!r} if b in novos),
+}}))
+"""
+
+
+def medir(pasta, repeticoes):
+    codigo = MEDICAO.format(bibliotecas=BIBLIOTECAS_PESADAS)
+    resultados = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, "-c", codigo], cwd=pasta, capture_output=True, text=True)
+        if saida.returncode != 0:
+            sys.exit(f"Falha ao medir {pasta}:\n{saida.stderr.strip()}")
+        resultados.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return resultados
+
+
+def imprimir(rotulo, resultados):
+    tempos = [r["tempo_ms"] for r in resultados]
+    print(f"{rotulo}: mediana {statistics.median(tempos):.0f} ms "
+          f"(mín {min(tempos):.0f}, máx {max(tempos):.0f}, {len(tempos)} execuções)")
+    print(f"  bibliotecas importadas: {', '.join(resultados[-1]['importadas']) or 'nenhuma'}")
+    for erro in resultados[-1]["erros"]:
+        print(f"  erro: {erro}")
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o tempo até a primeira renderização do app.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="execuções por medida (padrão: 5)")
+    parser.add_argument("--comparar", metavar="COMMIT", help="mede também este commit, para comparar")
+    args = parser.parse_args()
+
+    if args.comparar:
+        with tempfile.TemporaryDirectory() as temporaria:
+            pasta_antes = Path(temporaria) / "antes"
+            subprocess.run(["git", "worktree", "add", "--detach", str(pasta_antes), args.comparar],
+                           cwd=RAIZ, check=True, capture_output=True)
+            try:
+                antes = imprimir(f"Antes ({args.comparar})", medir(pasta_antes, args.repeticoes))
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", str(pasta_antes)], cwd=RAIZ, check=False)
+
+    depois = imprimir("Atual", medir(RAIZ, args.repeticoes))
+    if args.comparar:
+        print(f"Diferença: {depois - antes:+.0f} ms ({(depois - antes) / antes:+.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# ferramentas/migrar.py
+#
+# Aplica as migrações SQL de migracoes/ no banco indicado por DB_URL.
+#
+# Uso:
+#   python -m ferramentas.migrar            # aplica as migrações pendentes
+#   python -m ferramentas.migrar --status   # lista aplicadas e pendentes
+#
+# Cada arquivo NNNN_nome.sql roda em sua própria transação e é registrado na
+# tabela schema_migracoes; rodar de novo não reaplica nada.
+
+import argparse
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+PASTA_MIGRACOES = Path(__file__).resolve().parent.parent / "migracoes"
+
+# Chave do advisory lock que impede duas execuções simultâneas
+CHAVE_LOCK = 731
+
+
+def listar_migracoes():
+    migracoes = []
+    for arquivo in sorted(PASTA_MIGRACOES.glob("*.sql")):
+        versao, _, nome = arquivo.stem.partition("_")
+        sql = arquivo.read_text(encoding="utf-8")
+        checksum = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+        migracoes.append((versao, nome, sql, checksum))
+    return migracoes
+
+
+def carregar_aplicadas(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migracoes (
+            versao      TEXT        PRIMARY KEY,
+            nome        TEXT        NOT NULL,
+            checksum    TEXT        NOT NULL,
+            aplicado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+    """)
+    cursor.execute("SELECT versao, checksum FROM schema_migracoes;")
+    return dict(cursor.fetchall())
+
+
+def migrar(db_url, somente_status=False):
+    conn = psycopg2.connect(db_url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s);", (CHAVE_LOCK,))
+            aplicadas = carregar_aplicadas(cursor)
+            conn.commit()
+
+            for versao, nome, sql, checksum in listar_migracoes():
+                if versao in aplicadas:
+                    situacao = "aplicada"
+                    if aplicadas[versao] != checksum:
+                        situacao += " (arquivo alterado depois de aplicado!)"
+                    print(f"  {versao} {nome}: {situacao}")
+                    continue
+
+                if somente_status:
+                    print(f"  {versao} {nome}: pendente")
+                    continue
+
+                print(f"  {versao} {nome}: aplicando...", end=" ", flush=True)
+                try:
+                    cursor.execute(sql)
+                    cursor.execute(
+                        "INSERT INTO schema_migracoes (versao, nome, checksum) VALUES (%s, %s, %s);",
+                        (versao, nome, checksum),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    print("falhou")
+                    raise
+                print("ok")
+
+            cursor.execute("SELECT pg_advisory_unlock(%s);", (CHAVE_LOCK,))
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Aplica as migrações SQL do Festival de Talentos.")
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"), help="URL do banco (padrão: DB_URL do .env)")
+    parser.add_argument("--status", action="store_true", help="apenas lista as migrações aplicadas e pendentes")
+    args = parser.parse_args()
+
+    if not args.db_url:
+        sys.exit("DB_URL não definida. Use --db-url ou configure o .env.")
+
+    migrar(args.db_url, somente_status=args.status)
+
+
+if __name__ == "__main__":
+    main()
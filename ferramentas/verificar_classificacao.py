@@ -0,0 +1,179 @@
+# ferramentas/verificar_classificacao.py
+#
+# Confere a nota final calculada em SQL (paginas/nota_final.py, usada pela
+# Classificação) e a versão em pandas do arquivo do ano contra a fórmula em
+# Python que a página usava antes, equipe por equipe, sobre um festival
+# sintético de ferramentas.gerar_dados.
+#
+# Uso:
+#   python -m ferramentas.verificar_classificacao
+#   python -m ferramentas.verificar_classificacao --ano 2091 --semente 7
+#
+# Além das equipes sorteadas pelo gerador, cria em cada modalidade uma equipe
+# votada só por especialistas e outra só por jurados gerais. Tudo roda em uma
+# transação desfeita no final: nada fica gravado. Sai com código 1 se alguma
+# equipe divergir.
+
+import argparse
+import os
+import sys
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+from ferramentas import gerar_dados
+from paginas import nota_final
+
+TOLERANCIA = 1e-9
+
+
+# Fórmula original da página (classificacao.calcular_nota_final antes da consulta única)
+def nota_final_antiga(notas_equipe, especialistas):
+    if not notas_equipe:
+        return 0.0
+
+    notas_por_jurado = defaultdict(list)
+    for (id_jurado, id_criterio, nota) in notas_equipe:
+        notas_por_jurado[id_jurado].append(nota)
+
+    medias_jurados = {}
+    for jurado, lista_notas in notas_por_jurado.items():
+        medias_jurados[jurado] = sum(lista_notas) / len(lista_notas) if len(lista_notas) > 0 else 0.0
+
+    especialistas = set(especialistas)
+    notas_especialistas = [m for j, m in medias_jurados.items() if j in especialistas]
+    notas_gerais = [m for j, m in medias_jurados.items() if j not in especialistas]
+
+    G = len(notas_gerais)
+    E = len(notas_especialistas)
+    media_geral = sum(notas_gerais) / G if G > 0 else 0.0
+    soma_especialistas = sum(notas_especialistas)
+    return float((media_geral + soma_especialistas) / (E + 1) if (E > 0 or G > 0) else 0.0)
+
+
+# Equipes votadas só por especialistas e só por jurados gerais, em cada modalidade
+def criar_casos_extremos(cursor, ano):
+    cursor.execute("SELECT id_modalidade FROM tbl_modalidades WHERE id_ano = %s;", (ano,))
+    for (id_modalidade,) in cursor.fetchall():
+        cursor.execute("SELECT id_criterio FROM tbl_criterios WHERE id_modalidade = %s;", (id_modalidade,))
+        criterios = [r[0] for r in cursor.fetchall()]
+        cursor.execute("SELECT id_jurado FROM tbl_especialistas WHERE id_ano = %s AND id_modalidade = %s;",
+                       (ano, id_modalidade))
+        especialistas = [r[0] for r in cursor.fetchall()]
+        cursor.execute("""
+            SELECT id_jurado FROM tbl_jurados
+            WHERE id_ano = %s AND id_jurado <> ALL(%s)
+            ORDER BY id_jurado LIMIT 3;
+        """, (ano, especialistas))
+        gerais = [r[0] for r in cursor.fetchall()]
+
+        for nome, jurados in [("Só especialistas", especialistas), ("Só jurados gerais", gerais)]:
+            cursor.execute("""
+                INSERT INTO tbl_equipes (nome, ordem_apresentacao, id_modalidade, grau, status_votacao)
+                VALUES (%s, 0, %s, %s, 'votando') RETURNING id_equipe;
+            """, (nome, id_modalidade, gerar_dados.GRAUS[0]))
+            id_equipe = cursor.fetchone()[0]
+            for posicao, id_jurado in enumerate(jurados):
+                for id_criterio in criterios:
+                    cursor.execute("""
+                        INSERT INTO tbl_notas (status, nota, id_ano, id_modalidade, id_equipe, id_jurado, id_criterio)
+                        VALUES ('ok', %s, %s, %s, %s, %s, %s);
+                    """, (round(5 + posicao + id_criterio % 5 * 0.37, 2), ano, id_modalidade, id_equipe, id_jurado, id_criterio))
+
+
+# Compara as três versões em uma modalidade; devolve (divergências, contagem dos casos)
+def verificar_modalidade(cursor, ano, id_modalidade):
+    cursor.execute("SELECT id_jurado FROM tbl_especialistas WHERE id_ano = %s AND id_modalidade = %s;",
+                   (ano, id_modalidade))
+    especialistas = {r[0] for r in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT id_equipe, id_jurado, id_criterio, nota
+        FROM tbl_notas
+        WHERE id_ano = %s AND id_modalidade = %s AND status = 'ok';
+    """, (ano, id_modalidade))
+    # Em float: com Decimal a fórmula antiga somava 0.0 + Decimal nas equipes sem jurados gerais
+    notas_por_equipe = defaultdict(list)
+    for id_equipe, id_jurado, id_criterio, nota in cursor.fetchall():
+        notas_por_equipe[id_equipe].append((id_jurado, id_criterio, float(nota)))
+
+    notas_df = pd.DataFrame(
+        [(e, j, n) for e, notas in notas_por_equipe.items() for j, _, n in notas],
+        columns=["id_equipe", "id_jurado", "nota"],
+    )
+    em_pandas = nota_final.calcular_em_pandas(notas_df, especialistas)
+
+    cursor.execute(nota_final.QUERY_MODALIDADE, {"ano": ano, "modalidade": id_modalidade})
+    divergencias = []
+    casos = defaultdict(int)
+    for id_equipe, nome, _, nota_sql in cursor.fetchall():
+        notas_equipe = notas_por_equipe.get(id_equipe, [])
+        jurados = {j for j, _, _ in notas_equipe}
+        if not jurados:
+            casos["sem votos"] += 1
+        if jurados & especialistas:
+            casos["com especialistas"] += 1
+        if jurados - especialistas:
+            casos["com jurados gerais"] += 1
+
+        antiga = nota_final_antiga(notas_equipe, especialistas)
+        for versao, valor in [("sql", float(nota_sql)), ("pandas", em_pandas.get(id_equipe, 0.0))]:
+            if abs(valor - antiga) > TOLERANCIA:
+                divergencias.append(f"modalidade {id_modalidade}, {nome} ({id_equipe}): "
+                                    f"{versao} {valor:.10f} x fórmula antiga {antiga:.10f}")
+    return divergencias, casos
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Confere a nota final em SQL contra a fórmula antiga em Python.")
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"), help="URL do banco (padrão: DB_URL do .env)")
+    parser.add_argument("--ano", type=int, default=2091, help="ano usado para os dados sintéticos (padrão: 2091)")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.db_url:
+        sys.exit("DB_URL não definida. Use --db-url ou configure o .env.")
+
+    parametros = SimpleNamespace(
+        ano=args.ano, modalidades=3, criterios=4, jurados=20, especialistas=3, equipes=60,
+        participantes=2, jurados_por_equipe=10, votadas=0.4, parciais=0.3,
+        semente=args.semente, substituir=True,
+    )
+    conn = psycopg2.connect(args.db_url)
+    try:
+        with conn.cursor() as cursor:
+            gerar_dados.gerar(conn, parametros)
+            criar_casos_extremos(cursor, args.ano)
+
+            cursor.execute("SELECT id_modalidade FROM tbl_modalidades WHERE id_ano = %s ORDER BY id_modalidade;",
+                           (args.ano,))
+            divergencias = []
+            casos = defaultdict(int)
+            for (id_modalidade,) in cursor.fetchall():
+                divergencias_modalidade, casos_modalidade = verificar_modalidade(cursor, args.ano, id_modalidade)
+                divergencias += divergencias_modalidade
+                for caso, total in casos_modalidade.items():
+                    casos[caso] += total
+    finally:
+        # Nada do que foi gerado fica no banco
+        conn.rollback()
+        conn.close()
+
+    print("Equipes verificadas: " + ", ".join(f"{total} {caso}" for caso, total in sorted(casos.items())))
+    faltando = [c for c in ["sem votos", "com especialistas", "com jurados gerais"] if not casos[c]]
+    if faltando:
+        sys.exit(f"Os dados gerados não cobriram: {', '.join(faltando)}.")
+    if divergencias:
+        print(f"{len(divergencias)} divergência(s):")
+        for divergencia in divergencias:
+            print(f"  {divergencia}")
+        sys.exit(1)
+    print("SQL e pandas conferem com a fórmula antiga em todas as equipes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,117 +1,93 @@
 # main.py
 
-import streamlit as st
-from streamlit_option_menu import option_menu
-from paginas import (
-    cadastro_ano,
-    controle_votacao,
-    classificacao, 
-    cadastro_criterio,
-    cadastro_equipe,
-    cadastro_especialista,
-    cadastro_jurado,
-    cadastro_modalidade,
-    cadastro_participante,
-    alterar_senha
-)
-import os
-from dotenv import load_dotenv
-from pathlib import Path
+import importlib
 import sys
+from pathlib import Path
 
-# Carrega as variáveis de ambiente
-load_dotenv()
+import streamlit as st
+from streamlit_option_menu import option_menu
 
 # Adiciona o diretório atual ao path para permitir importações
 sys.path.append(str(Path(__file__).parent))
 
+# Só o necessário em toda execução; o .env é carregado uma vez por processo em paginas/config.py
+from paginas import instrumentacao, memoria
+
 # Configuração da página - Deve ser a primeira função do Streamlit
 st.set_page_config(page_title="Festival de Talentos", layout="wide")
 
+# Páginas do menu: título, ícone e módulo em paginas/ (com uma função show()).
+# O módulo só é importado quando a página é aberta pela primeira vez no processo,
+# então a primeira renderização não carrega pandas, psycopg2 nem pyarrow.
+PAGINAS = [
+    ("Página Inicial", "house", None),
+    ("Gerenciar Votação", "key", "controle_votacao"),
+    ("Classificação", "calendar", "classificacao"),
+    ("Cadastro Ano", "calendar", "cadastro_ano"),
+    ("Cadastro Modalidade", "clipboard-data", "cadastro_modalidade"),
+    ("Cadastro Critério", "list-task", "cadastro_criterio"),
+    ("Cadastro Equipe", "people", "cadastro_equipe"),
+    ("Cadastro Participante", "person-plus", "cadastro_participante"),
+    ("Cadastro Jurado", "person", "cadastro_jurado"),
+    ("Cadastro Especialista", "gear", "cadastro_especialista"),
+    ("Memória", "memory", "memoria"),
+    ("Trocar Senha", "key", "alterar_senha"),
+    ("Sair", "box-arrow-right", None),
+]
+MODULOS = {titulo: modulo for titulo, _, modulo in PAGINAS}
+
+
+def carregar_pagina(titulo):
+    # importlib guarda o módulo em sys.modules: as próximas execuções não importam de novo
+    return importlib.import_module(f"paginas.{MODULOS[titulo]}")
+
+
 def main():
     # Cria o menu lateral
     with st.sidebar:
         escolha = option_menu(
             menu_title="Menu Principal",  # Título do menu
-            options=[
-                "Página Inicial",
-                "Gerenciar Votação",
-                "Classificação",
-                "Cadastro Ano",
-                "Cadastro Modalidade",
-                "Cadastro Critério",
-                "Cadastro Equipe",
-                "Cadastro Participante",
-                "Cadastro Jurado",
-                "Cadastro Especialista",
-                "Trocar Senha",
-                "Sair"
-            ],
-            icons=[
-                "house",             # Página Inicial
-                "key",
-                "calendar",
-                "calendar",          # Cadastro Ano
-                "clipboard-data",    # Cadastro Modalidade
-                "list-task",         # Cadastro Critério
-                "people",            # Cadastro Equipe
-                "person-plus",       # Cadastro Participante
-                "person",            # Cadastro Jurado
-                "gear",              # Cadastro Especialista
-                "key",               # Trocar Senha
-                "box-arrow-right"    # Sair
-            ],
+            options=[titulo for titulo, _, _ in PAGINAS],
+            icons=[icone for _, icone, _ in PAGINAS],
             menu_icon="cast",
             default_index=0,         # Índice padrão selecionado
             orientation="vertical"   # Orientação do menu
         )
 
-    # Exibe o conteúdo de acordo com a opção do menu
-    if escolha == "Página Inicial":
-        st.title("Bem-vindo ao Festival de Talentos")
-        st.write("""
-            Utilize o menu lateral para navegar entre as diferentes funcionalidades do sistema.
-            Aqui você pode adicionar informações, gerenciar cadastros e muito mais.
-        """)
-        # Adicione aqui mais conteúdo para a Página Inicial, como estatísticas, gráficos, etc.
-
-    elif escolha == "Cadastro Ano":
-        cadastro_ano.show()
+    # Descarta as chaves temporárias da página anterior; a amostragem do uso de memória
+    # roda em uma thread própria, iniciada uma vez por processo
+    memoria.podar_sessao(escolha)
+    memoria.historico()
+
+    # Perfil da execução (consultas, tempos), exibido no painel de depuração e gravado no log
+    instrumentacao.iniciar()
+    try:
+        # Exibe o conteúdo de acordo com a opção do menu
+        if escolha == "Página Inicial":
+            st.title("Bem-vindo ao Festival de Talentos")
+            st.write("""
+                Utilize o menu lateral para navegar entre as diferentes funcionalidades do sistema.
+                Aqui você pode adicionar informações, gerenciar cadastros e muito mais.
+            """)
+            # Adicione aqui mais conteúdo para a Página Inicial, como estatísticas, gráficos, etc.
+
+        elif MODULOS.get(escolha):
+            carregar_pagina(escolha).show()
+
+        elif escolha == "Sair":
+            # Implementação da funcionalidade de Sair
+            # Dependendo de como você gerencia a sessão de login, ajuste conforme necessário
+            if 'pagina' in st.session_state:
+                del st.session_state['pagina']
+            st.success("Você foi deslogado com sucesso.")
+            st.experimental_rerun()  # Reexecuta o script para refletir as mudanças
+    finally:
+        registro = instrumentacao.finalizar(escolha)
 
-    elif escolha == "Gerenciar Votação":
-        controle_votacao.show()
-
-    elif escolha == "Classificação":
-        classificacao.show()
-
-    elif escolha == "Cadastro Critério":
-        cadastro_criterio.show()
-
-    elif escolha == "Cadastro Equipe":
-        cadastro_equipe.show()
-
-    elif escolha == "Cadastro Especialista":
-        cadastro_especialista.show()
-
-    elif escolha == "Cadastro Jurado":
-        cadastro_jurado.show()
-
-    elif escolha == "Cadastro Modalidade":
-        cadastro_modalidade.show()
-
-    elif escolha == "Cadastro Participante":
-        cadastro_participante.show()
-
-    elif escolha == "Trocar Senha":
-        alterar_senha.show()
+    with st.sidebar:
+        if st.toggle("Modo de depuração", key="modo_depuracao"):
+            instrumentacao.painel_depuracao(registro)
 
-    elif escolha == "Sair":
-        # Implementação da funcionalidade de Sair
-        # Dependendo de como você gerencia a sessão de login, ajuste conforme necessário
-        if 'pagina' in st.session_state:
-            del st.session_state['pagina']
-        st.success("Você foi deslogado com sucesso.")
-        st.experimental_rerun()  # Reexecuta o script para refletir as mudanças
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+-- Esquema base do Festival de Talentos, como as páginas em paginas/ o utilizam.
+--
+-- Usa IF NOT EXISTS em tudo: em um banco que já existe (criado antes destas
+-- migrações) esta versão não altera nada e apenas passa a ser registrada.
+
+CREATE TABLE IF NOT EXISTS tbl_anos (
+    id_ano INTEGER PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS tbl_modalidades (
+    id_modalidade SERIAL       PRIMARY KEY,
+    nome          VARCHAR(100) NOT NULL,
+    id_ano        INTEGER      NOT NULL REFERENCES tbl_anos (id_ano) ON DELETE CASCADE,
+    UNIQUE (nome, id_ano)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_criterios (
+    id_criterio   SERIAL       PRIMARY KEY,
+    nome          VARCHAR(100) NOT NULL,
+    id_modalidade INTEGER      NOT NULL REFERENCES tbl_modalidades (id_modalidade) ON DELETE CASCADE,
+    UNIQUE (nome, id_modalidade)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_jurados (
+    id_jurado SERIAL       PRIMARY KEY,
+    nome      VARCHAR(100) NOT NULL,
+    login     VARCHAR(50)  NOT NULL UNIQUE,
+    senha     VARCHAR(255) NOT NULL,
+    id_ano    INTEGER      NOT NULL REFERENCES tbl_anos (id_ano) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS tbl_especialistas (
+    id_ano        INTEGER NOT NULL REFERENCES tbl_anos (id_ano) ON DELETE CASCADE,
+    id_jurado     INTEGER NOT NULL REFERENCES tbl_jurados (id_jurado) ON DELETE CASCADE,
+    id_modalidade INTEGER NOT NULL REFERENCES tbl_modalidades (id_modalidade) ON DELETE CASCADE,
+    PRIMARY KEY (id_ano, id_jurado, id_modalidade)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_equipes (
+    id_equipe          SERIAL       PRIMARY KEY,
+    nome               VARCHAR(150) NOT NULL,
+    ordem_apresentacao INTEGER      NOT NULL,
+    id_modalidade      INTEGER      NOT NULL REFERENCES tbl_modalidades (id_modalidade) ON DELETE CASCADE,
+    grau               VARCHAR(50)  NOT NULL,
+    ficha_tecnica      TEXT,
+    status_votacao     VARCHAR(20)  NOT NULL DEFAULT 'aguardando',
+    UNIQUE (nome, id_modalidade)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_participantes (
+    id_participante SERIAL       PRIMARY KEY,
+    nome            VARCHAR(100) NOT NULL,
+    turma           VARCHAR(50)  NOT NULL,
+    id_equipe       INTEGER      NOT NULL REFERENCES tbl_equipes (id_equipe) ON DELETE CASCADE,
+    UNIQUE (nome, id_equipe)
+);
+
+CREATE TABLE IF NOT EXISTS tbl_notas (
+    id_nota       SERIAL       PRIMARY KEY,
+    status        VARCHAR(20)  NOT NULL DEFAULT 'liberado',
+    nota          NUMERIC(5,2),
+    id_ano        INTEGER      NOT NULL REFERENCES tbl_anos (id_ano) ON DELETE CASCADE,
+    id_modalidade INTEGER      NOT NULL REFERENCES tbl_modalidades (id_modalidade) ON DELETE CASCADE,
+    id_equipe     INTEGER      NOT NULL REFERENCES tbl_equipes (id_equipe) ON DELETE CASCADE,
+    id_jurado     INTEGER      NOT NULL REFERENCES tbl_jurados (id_jurado) ON DELETE CASCADE,
+    id_criterio   INTEGER      NOT NULL REFERENCES tbl_criterios (id_criterio) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS tbl_classificacoes (
+    id_classificacao SERIAL        PRIMARY KEY,
+    nota_final       NUMERIC(10,4) NOT NULL DEFAULT 0,
+    id_ano           INTEGER       NOT NULL REFERENCES tbl_anos (id_ano) ON DELETE CASCADE,
+    id_modalidade    INTEGER       NOT NULL REFERENCES tbl_modalidades (id_modalidade) ON DELETE CASCADE,
+    id_equipe        INTEGER       NOT NULL REFERENCES tbl_equipes (id_equipe) ON DELETE CASCADE
+);
@@ -0,0 +1,21 @@
+-- Garante uma única classificação por (ano, modalidade, equipe).
+-- Necessário para o INSERT ... ON CONFLICT usado em paginas/classificacao.py.
+
+-- Remove duplicatas antigas, mantendo o registro mais recente de cada equipe
+DELETE FROM tbl_classificacoes c
+USING tbl_classificacoes d
+WHERE c.id_ano = d.id_ano
+  AND c.id_modalidade = d.id_modalidade
+  AND c.id_equipe = d.id_equipe
+  AND c.id_classificacao < d.id_classificacao;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_classificacoes_ano_modalidade_equipe'
+    ) THEN
+        ALTER TABLE tbl_classificacoes
+            ADD CONSTRAINT uq_classificacoes_ano_modalidade_equipe
+            UNIQUE (id_ano, id_modalidade, id_equipe);
+    END IF;
+END $$;
@@ -0,0 +1,77 @@
+-- Marcador de alterações das notas por ano/modalidade.
+--
+-- Toda escrita em tbl_notas (ou em tbl_especialistas, que muda o peso dos votos)
+-- incrementa a versão da modalidade afetada. A página de Classificação grava em
+-- versao_classificacao a versão usada no último cálculo e só recalcula quando
+-- as duas diferem.
+
+CREATE TABLE IF NOT EXISTS tbl_notas_versao (
+    id_ano               INTEGER     NOT NULL,
+    id_modalidade        INTEGER     NOT NULL,
+    versao               BIGINT      NOT NULL DEFAULT 1,
+    versao_classificacao BIGINT,
+    atualizado_em        TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (id_ano, id_modalidade)
+);
+
+-- Modalidades que já têm notas começam "sujas", forçando um primeiro cálculo
+INSERT INTO tbl_notas_versao (id_ano, id_modalidade)
+SELECT DISTINCT id_ano, id_modalidade FROM tbl_notas
+ON CONFLICT (id_ano, id_modalidade) DO NOTHING;
+
+-- Gatilho de comando (e não de linha): um INSERT de centenas de cédulas
+-- incrementa a versão uma única vez por modalidade
+CREATE OR REPLACE FUNCTION fn_incrementa_versao_notas() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO tbl_notas_versao AS v (id_ano, id_modalidade)
+        SELECT DISTINCT id_ano, id_modalidade FROM novas
+        ON CONFLICT (id_ano, id_modalidade)
+        DO UPDATE SET versao = v.versao + 1, atualizado_em = now();
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO tbl_notas_versao AS v (id_ano, id_modalidade)
+        SELECT id_ano, id_modalidade FROM novas
+        UNION
+        SELECT id_ano, id_modalidade FROM antigas
+        ON CONFLICT (id_ano, id_modalidade)
+        DO UPDATE SET versao = v.versao + 1, atualizado_em = now();
+    ELSE
+        INSERT INTO tbl_notas_versao AS v (id_ano, id_modalidade)
+        SELECT DISTINCT id_ano, id_modalidade FROM antigas
+        ON CONFLICT (id_ano, id_modalidade)
+        DO UPDATE SET versao = v.versao + 1, atualizado_em = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notas_versao_insert ON tbl_notas;
+CREATE TRIGGER trg_notas_versao_insert
+    AFTER INSERT ON tbl_notas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_incrementa_versao_notas();
+
+DROP TRIGGER IF EXISTS trg_notas_versao_update ON tbl_notas;
+CREATE TRIGGER trg_notas_versao_update
+    AFTER UPDATE ON tbl_notas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_incrementa_versao_notas();
+
+DROP TRIGGER IF EXISTS trg_notas_versao_delete ON tbl_notas;
+CREATE TRIGGER trg_notas_versao_delete
+    AFTER DELETE ON tbl_notas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_incrementa_versao_notas();
+
+-- Mudanças de especialistas alteram o peso dos votos já dados
+DROP TRIGGER IF EXISTS trg_especialistas_versao_insert ON tbl_especialistas;
+CREATE TRIGGER trg_especialistas_versao_insert
+    AFTER INSERT ON tbl_especialistas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_incrementa_versao_notas();
+
+DROP TRIGGER IF EXISTS trg_especialistas_versao_delete ON tbl_especialistas;
+CREATE TRIGGER trg_especialistas_versao_delete
+    AFTER DELETE ON tbl_especialistas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_incrementa_versao_notas();
@@ -0,0 +1,67 @@
+-- Índices para os caminhos de acesso das páginas mais usadas.
+
+-- Uma cédula por (equipe, jurado, critério). Também atende aos filtros por
+-- id_equipe e por (id_equipe, id_jurado) em controle_votacao.
+--
+-- Antes do índice, as cédulas duplicadas ficam só com a nota válida (status 'ok'
+-- e nota preenchida). Se a mesma cédula tiver notas válidas diferentes, não há
+-- como escolher: a migração falha e lista as cédulas para serem resolvidas à mão.
+DO $$
+DECLARE
+    conflitos TEXT;
+BEGIN
+    SELECT string_agg(
+        format('equipe %s, jurado %s, critério %s: notas %s', id_equipe, id_jurado, id_criterio, notas),
+        E'\n'
+    )
+    INTO conflitos
+    FROM (
+        SELECT id_equipe, id_jurado, id_criterio, string_agg(DISTINCT nota::text, ', ') AS notas
+        FROM tbl_notas
+        WHERE status = 'ok' AND nota IS NOT NULL
+        GROUP BY id_equipe, id_jurado, id_criterio
+        HAVING COUNT(DISTINCT nota) > 1
+    ) c;
+
+    IF conflitos IS NOT NULL THEN
+        RAISE EXCEPTION 'Cédulas com notas válidas diferentes:%', E'\n' || conflitos;
+    END IF;
+END
+$$;
+
+DELETE FROM tbl_notas n
+USING (
+    SELECT
+        id_nota,
+        ROW_NUMBER() OVER (
+            PARTITION BY id_equipe, id_jurado, id_criterio
+            ORDER BY COALESCE(status = 'ok' AND nota IS NOT NULL, FALSE) DESC, id_nota
+        ) AS ordem
+    FROM tbl_notas
+) d
+WHERE n.id_nota = d.id_nota
+  AND d.ordem > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_notas_equipe_jurado_criterio
+    ON tbl_notas (id_equipe, id_jurado, id_criterio);
+
+-- Cálculo da classificação (classificacao.calcular_notas_finais)
+CREATE INDEX IF NOT EXISTS ix_notas_ano_modalidade_equipe_status
+    ON tbl_notas (id_ano, id_modalidade, id_equipe, status);
+
+-- Listagem de equipes por modalidade e grau (controle_votacao, cadastro_participante)
+CREATE INDEX IF NOT EXISTS ix_equipes_modalidade_grau
+    ON tbl_equipes (id_modalidade, grau);
+
+-- Participantes por equipe, já na ordem de exibição
+CREATE INDEX IF NOT EXISTS ix_participantes_equipe_nome
+    ON tbl_participantes (id_equipe, nome);
+
+-- Especialistas por ano e modalidade
+CREATE INDEX IF NOT EXISTS ix_especialistas_ano_modalidade
+    ON tbl_especialistas (id_ano, id_modalidade, id_jurado);
+
+-- Chaves estrangeiras usadas como filtro nos selectboxes dos cadastros
+CREATE INDEX IF NOT EXISTS ix_modalidades_ano ON tbl_modalidades (id_ano);
+CREATE INDEX IF NOT EXISTS ix_criterios_modalidade ON tbl_criterios (id_modalidade);
+CREATE INDEX IF NOT EXISTS ix_jurados_ano ON tbl_jurados (id_ano);
@@ -0,0 +1,11 @@
+-- Índices na mesma ordem da paginação por keyset (paginas/paginacao.py):
+-- cada página é uma busca no índice a partir do cursor, sem OFFSET.
+
+-- Participantes de uma equipe por (nome, id_participante); substitui o índice de 0004
+CREATE INDEX IF NOT EXISTS ix_participantes_equipe_nome_id
+    ON tbl_participantes (id_equipe, nome, id_participante);
+DROP INDEX IF EXISTS ix_participantes_equipe_nome;
+
+-- Equipes de uma modalidade por (ordem_apresentacao, id_equipe)
+CREATE INDEX IF NOT EXISTS ix_equipes_modalidade_ordem_id
+    ON tbl_equipes (id_modalidade, ordem_apresentacao, id_equipe);
@@ -0,0 +1,41 @@
+-- Avisos de alteração das notas para o Controle das Votações.
+--
+-- Toda escrita em tbl_notas dispara um NOTIFY no canal notas_alteradas para
+-- cada equipe afetada, com o id_equipe como conteúdo. O ouvinte do app
+-- (paginas/notificacoes.py) recarrega apenas os painéis dessas equipes.
+-- O Postgres só entrega os avisos no COMMIT e descarta os repetidos da mesma
+-- transação: um INSERT de centenas de cédulas vira um aviso por equipe.
+
+CREATE OR REPLACE FUNCTION fn_notifica_notas() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM pg_notify('notas_alteradas', e.id_equipe::text)
+        FROM (SELECT DISTINCT id_equipe FROM novas) e;
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM pg_notify('notas_alteradas', e.id_equipe::text)
+        FROM (SELECT id_equipe FROM novas UNION SELECT id_equipe FROM antigas) e;
+    ELSE
+        PERFORM pg_notify('notas_alteradas', e.id_equipe::text)
+        FROM (SELECT DISTINCT id_equipe FROM antigas) e;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notas_notifica_insert ON tbl_notas;
+CREATE TRIGGER trg_notas_notifica_insert
+    AFTER INSERT ON tbl_notas
+    REFERENCING NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_notifica_notas();
+
+DROP TRIGGER IF EXISTS trg_notas_notifica_update ON tbl_notas;
+CREATE TRIGGER trg_notas_notifica_update
+    AFTER UPDATE ON tbl_notas
+    REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_notifica_notas();
+
+DROP TRIGGER IF EXISTS trg_notas_notifica_delete ON tbl_notas;
+CREATE TRIGGER trg_notas_notifica_delete
+    AFTER DELETE ON tbl_notas
+    REFERENCING OLD TABLE AS antigas
+    FOR EACH STATEMENT EXECUTE FUNCTION fn_notifica_notas();
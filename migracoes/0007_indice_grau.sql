@@ -0,0 +1,7 @@
+-- controle_votacao (e ferramentas/carga) filtram as equipes com LOWER(grau) = LOWER(%s),
+-- que o índice (id_modalidade, grau) da 0004 não atende além do id_modalidade.
+-- cadastro_participante compara grau direto e continua usando o prefixo id_modalidade.
+DROP INDEX IF EXISTS ix_equipes_modalidade_grau;
+
+CREATE INDEX IF NOT EXISTS ix_equipes_modalidade_grau
+    ON tbl_equipes (id_modalidade, LOWER(grau));
@@ -0,0 +1,204 @@
+# paginas/arquivamento.py
+#
+# Arquivo de um ano do festival: todas as tabelas de um id_ano gravadas em
+# arquivos Arrow IPC (um por tabela, em ARQUIVOS_DIR/ano_<ano>/). Os arquivos
+# são abertos com memory map, sem copiar os dados para a memória, e podem ser
+# restaurados no banco com COPY. A Classificação também lê direto deles.
+
+import io
+import os
+import shutil
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import streamlit as st
+from paginas import catalogo, config, db, nota_final  # noqa: F401
+
+ARQUIVOS_DIR = Path(os.getenv("ARQUIVOS_DIR", Path(__file__).resolve().parent.parent / "arquivos"))
+
+TAMANHO_LOTE = 5000
+
+# Tabelas do ano na ordem de restauração (pais antes dos filhos), com a coluna serial
+# (se houver) e o filtro que seleciona as linhas do ano
+TABELAS = [
+    ("tbl_anos", None, "id_ano = %(ano)s"),
+    ("tbl_modalidades", "id_modalidade", "id_ano = %(ano)s"),
+    ("tbl_criterios", "id_criterio",
+     "id_modalidade IN (SELECT id_modalidade FROM tbl_modalidades WHERE id_ano = %(ano)s)"),
+    ("tbl_jurados", "id_jurado", "id_ano = %(ano)s"),
+    ("tbl_especialistas", None, "id_ano = %(ano)s"),
+    ("tbl_equipes", "id_equipe",
+     "id_modalidade IN (SELECT id_modalidade FROM tbl_modalidades WHERE id_ano = %(ano)s)"),
+    ("tbl_participantes", "id_participante",
+     "id_equipe IN (SELECT e.id_equipe FROM tbl_equipes e "
+     "JOIN tbl_modalidades m ON m.id_modalidade = e.id_modalidade WHERE m.id_ano = %(ano)s)"),
+    ("tbl_notas", "id_nota", "id_ano = %(ano)s"),
+    ("tbl_classificacoes", "id_classificacao", "id_ano = %(ano)s"),
+]
+
+# Tipos do Postgres (OID) usados nestas tabelas e o tipo Arrow correspondente;
+# NUMERIC vira decimal para não perder casas das notas
+TIPOS_ARROW = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    25: pa.string(),
+    1043: pa.string(),
+    1700: pa.decimal128(38, 10),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+}
+
+
+def pasta_do_ano(ano):
+    return ARQUIVOS_DIR / f"ano_{int(ano)}"
+
+
+def existe_arquivo(ano):
+    return (pasta_do_ano(ano) / "tbl_anos.arrow").exists()
+
+
+# Anos que têm arquivo gravado
+def anos_arquivados():
+    if not ARQUIVOS_DIR.exists():
+        return []
+    anos = []
+    for pasta in ARQUIVOS_DIR.glob("ano_*"):
+        sufixo = pasta.name.removeprefix("ano_")
+        if sufixo.isdigit() and (pasta / "tbl_anos.arrow").exists():
+            anos.append(int(sufixo))
+    return sorted(anos)
+
+
+# Grava uma tabela do ano, lendo de um cursor nomeado em lotes
+def arquivar_tabela(conn, tabela, filtro, ano, destino):
+    with conn.cursor(name=f"arquivar_{tabela}") as cursor:
+        cursor.itersize = TAMANHO_LOTE
+        cursor.execute(f"SELECT * FROM {tabela} WHERE {filtro};", {"ano": int(ano)})
+        lote = cursor.fetchmany(TAMANHO_LOTE)
+        esquema = pa.schema([
+            (coluna.name, TIPOS_ARROW.get(coluna.type_code, pa.string())) for coluna in cursor.description
+        ])
+        total = 0
+        with pa.OSFile(str(destino), "wb") as saida, pa.ipc.new_file(saida, esquema) as escritor:
+            while lote:
+                colunas = list(zip(*lote))
+                arrays = [pa.array(coluna, type=campo.type, from_pandas=False) for coluna, campo in zip(colunas, esquema)]
+                escritor.write_batch(pa.record_batch(arrays, schema=esquema))
+                total += len(lote)
+                lote = cursor.fetchmany(TAMANHO_LOTE)
+        return total
+
+
+# Grava todas as tabelas do ano; os arquivos são escritos em uma pasta temporária e
+# só substituem o arquivo anterior quando tudo deu certo
+def arquivar_ano(ano):
+    pasta = pasta_do_ano(ano)
+    temporaria = pasta.with_name(pasta.name + ".tmp")
+    temporaria.mkdir(parents=True, exist_ok=True)
+    totais = {}
+    # Uma única transação REPEATABLE READ: todas as tabelas do mesmo instante
+    with db.get_connection() as conn:
+        conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+        try:
+            for tabela, _, filtro in TABELAS:
+                totais[tabela] = arquivar_tabela(conn, tabela, filtro, ano, temporaria / f"{tabela}.arrow")
+        finally:
+            conn.rollback()
+            conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
+
+    # Troca as pastas só com renomeações: em nenhum momento o ano fica sem arquivo completo
+    antiga = pasta.with_name(pasta.name + ".antigo")
+    if antiga.exists():
+        shutil.rmtree(antiga)
+    if pasta.exists():
+        pasta.rename(antiga)
+    temporaria.rename(pasta)
+    if antiga.exists():
+        shutil.rmtree(antiga)
+    abrir_arquivo.clear()
+    return totais
+
+
+# Tabelas do arquivo de um ano, abertas com memory map (leitura sem cópia).
+# mtime entra na chave do cache para que um novo arquivamento seja relido.
+@st.cache_resource(show_spinner=False)
+def abrir_arquivo(ano, mtime=None):
+    pasta = pasta_do_ano(ano)
+    tabelas = {}
+    for tabela, _, _ in TABELAS:
+        fonte = pa.memory_map(str(pasta / f"{tabela}.arrow"), "r")
+        tabelas[tabela] = pa.ipc.open_file(fonte).read_all()
+    return tabelas
+
+
+def carregar_arquivo(ano):
+    return abrir_arquivo(int(ano), (pasta_do_ano(ano) / "tbl_anos.arrow").stat().st_mtime)
+
+
+# Restaura o arquivo de um ano com COPY, mantendo os ids originais. O ano não pode existir no banco.
+def restaurar_ano(ano):
+    tabelas = carregar_arquivo(ano)
+    totais = {}
+    with db.get_cursor() as cursor:
+        cursor.execute("SELECT 1 FROM tbl_anos WHERE id_ano = %s;", (int(ano),))
+        if cursor.fetchone():
+            raise ValueError(f"O ano {ano} já existe no banco. Apague-o antes de restaurar o arquivo.")
+
+        for tabela, coluna_serial, _ in TABELAS:
+            dados = tabelas[tabela]
+            if dados.num_rows:
+                buffer = io.BytesIO()
+                # Valores entre aspas e nulos sem aspas: o COPY distingue texto vazio de NULL
+                opcoes = pa_csv.WriteOptions(include_header=False, quoting_style="all_valid")
+                pa_csv.write_csv(dados, buffer, opcoes)
+                buffer.seek(0)
+                colunas = ", ".join(dados.column_names)
+                cursor.copy_expert(f"COPY {tabela} ({colunas}) FROM STDIN WITH (FORMAT csv)", buffer)
+            totais[tabela] = dados.num_rows
+
+            # Os ids vieram do arquivo: a sequência precisa continuar depois do maior deles
+            if coluna_serial:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence(%s, %s), GREATEST((SELECT MAX({coluna_serial}) FROM {tabela}), 1));",
+                    (tabela, coluna_serial),
+                )
+    catalogo.invalidar_anos()
+    return totais
+
+
+# ---- Leitura da Classificação a partir do arquivo (somente leitura) ----
+
+def filtrar(tabela, coluna, valor):
+    return tabela.filter(pc.equal(tabela[coluna], valor))
+
+
+def modalidades_do_arquivo(tabelas):
+    df = tabelas["tbl_modalidades"].select(["id_modalidade", "nome"]).to_pandas()
+    return df.sort_values("nome").reset_index(drop=True)
+
+
+# Nota final das equipes da modalidade calculada sobre o arquivo (paginas/nota_final.py)
+def classificacao_do_arquivo(tabelas, id_modalidade):
+    equipes = filtrar(tabelas["tbl_equipes"], "id_modalidade", id_modalidade).select(["id_equipe", "nome", "grau"]).to_pandas()
+    equipes = equipes.rename(columns={"nome": "nome_equipe"})
+
+    notas = filtrar(tabelas["tbl_notas"], "id_modalidade", id_modalidade)
+    notas = notas.filter(pc.equal(notas["status"], "ok")).select(["id_equipe", "id_jurado", "nota"]).to_pandas()
+    especialistas = set(filtrar(tabelas["tbl_especialistas"], "id_modalidade", id_modalidade)["id_jurado"].to_pylist())
+
+    finais = nota_final.calcular_em_pandas(notas, especialistas)
+    equipes["nota_final"] = equipes["id_equipe"].map(finais).fillna(0.0).astype(float)
+    return equipes.sort_values(["grau", "nome_equipe"]).reset_index(drop=True)
+
+
+# {id_equipe: [nomes em ordem alfabética]} das equipes da modalidade
+def participantes_do_arquivo(tabelas, id_modalidade):
+    ids_equipes = filtrar(tabelas["tbl_equipes"], "id_modalidade", id_modalidade)["id_equipe"]
+    participantes = tabelas["tbl_participantes"]
+    participantes = participantes.filter(pc.is_in(participantes["id_equipe"], value_set=ids_equipes))
+    df = participantes.select(["id_equipe", "nome"]).to_pandas().sort_values("nome")
+    return {int(id_equipe): grupo["nome"].tolist() for id_equipe, grupo in df.groupby("id_equipe")}
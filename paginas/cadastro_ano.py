@@ -1,12 +1,7 @@
 import streamlit as st
-import psycopg2
 from psycopg2 import errors
-from dotenv import load_dotenv
-import os
 import pandas as pd
-
-load_dotenv()
-DB_URL = os.getenv("DB_URL")
+from paginas import arquivamento, catalogo, db, tabela, virada_ano
 
 def show():
     st.write("# Cadastros")
@@ -16,12 +11,9 @@ def show():
     if st.button("Salvar", key="btn_salvar"):
         if ano:
                 try:
-                    conn = psycopg2.connect(DB_URL)
-                    cursor = conn.cursor()
-
                     query = "INSERT INTO tbl_anos (id_ano) VALUES (%s)"
-                    cursor.execute(query, (ano,))
-                    conn.commit()
+                    db.executar(query, (ano,))
+                    catalogo.invalidar_anos()
 
                     st.success(f"Ano '{ano}' inserido com sucesso no banco de dados!")
                 except errors.UniqueViolation:
@@ -29,60 +21,90 @@ def show():
 
                 except Exception as e:
                     st.error(f"Ocorreu um erro ao inserir o ano: {e}")
-                finally:
-                    if cursor:
-                        cursor.close()
-                    if conn:
-                        conn.close()
 
 
     st.title("Anos cadastrados")
 
-    def apagar_ano(ano):
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        delete_query = "DELETE FROM tbl_anos WHERE id_ano = %s;"
-        # Converter para int nativo do Python
-        ano_python = int(ano)
-        cursor.execute(delete_query, (ano_python,))
-        conn.commit()
-        cursor.close()
-        conn.close()
+    # Apaga os anos selecionados em um único comando
+    def apagar_anos(anos):
+        try:
+            delete_query = "DELETE FROM tbl_anos WHERE id_ano = ANY(%s);"
+            # Converter para int nativo do Python
+            apagados = db.executar(delete_query, ([int(a) for a in anos],))
+            catalogo.invalidar_anos()
+            st.toast(f"{apagados} ano(s) apagado(s) com sucesso.")
+            return True
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao apagar os anos: {e}")
+            return False
 
     def carregar_dados():
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        query = 'SELECT id_ano AS "Anos" FROM tbl_anos;'
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        colunas = [desc[0] for desc in cursor.description]
-        cursor.close()
-        conn.close()
-        df = pd.DataFrame(rows, columns=colunas)
-        # Converter para int nativo do Python
-        df["Anos"] = df["Anos"].apply(lambda x: int(x))
+        # Mesma lista usada nas caixas de seleção, já com int nativo do Python
+        df = pd.DataFrame({"Anos": catalogo.carregar_anos()})
         return df
 
-    # Se há um ano a apagar no estado, apague antes de carregar os dados
-    if 'delete_ano' in st.session_state:
-        apagar_ano(st.session_state['delete_ano'])
-        del st.session_state['delete_ano']  # Remove a chave para não apagar novamente na próxima execução
-
     df = carregar_dados()
 
     if df.empty:
         st.write("Não há dados para exibir.")
     else:
-        col_titulo_ano, col_titulo_acoes = st.columns([3,1])
-        col_titulo_ano.write("**Anos**")
-        col_titulo_acoes.write("**Ações**")
-
-        # Exibição da tabela linha a linha
-        for index, row in df.iterrows():
-            ano_val = row["Anos"]
-            col_ano, col_btn = st.columns([3,1])
-            col_ano.write(ano_val)
-
-            # Ao clicar no botão, apenas marca no session_state o ano a ser apagado
-            if col_btn.button("Apagar", key=f"apagar_{ano_val}"):
-                st.session_state['delete_ano'] = ano_val
\ No newline at end of file
+        selecionados = tabela.tabela_selecionavel(df, "anos", "Anos", {"Anos": "Anos"})
+        tabela.botao_apagar_selecionados("anos", selecionados, apagar_anos)
+
+    st.title("Preparar nova edição")
+    st.caption("Copia modalidades, critérios, jurados e especialistas de um ano para outro. "
+               "Os logins dos jurados copiados recebem o sufixo _<ano>.")
+
+    if df.empty:
+        st.write("Cadastre um ano antes de copiar a estrutura.")
+    else:
+        col_origem, col_destino = st.columns(2)
+        ano_origem = col_origem.selectbox("Copiar do ano:", df["Anos"].tolist(), index=len(df) - 1, key="ano_origem")
+        ano_destino = col_destino.number_input("Para o ano:", min_value=1900, max_value=2999, step=1,
+                                               value=int(ano_origem) + 1, key=f"ano_destino_{ano_origem}")
+
+        if st.button("Copiar estrutura", key="btn_copiar_estrutura"):
+            try:
+                totais = virada_ano.copiar_estrutura(ano_origem, ano_destino)
+                st.success(
+                    f"Ano {ano_destino} preparado: {totais['modalidades']} modalidade(s), "
+                    f"{totais['criterios']} critério(s), {totais['jurados']} jurado(s) e "
+                    f"{totais['especialistas']} especialista(s) copiados."
+                )
+            except ValueError as e:
+                st.error(str(e))
+            except Exception as e:
+                st.error(f"Ocorreu um erro ao copiar a estrutura: {e}")
+
+    st.title("Arquivo dos anos")
+    st.caption("Grava todas as tabelas de um ano em arquivos Arrow, que podem ser restaurados depois "
+               "ou consultados pela página de Classificação sem acessar o banco.")
+
+    col_arquivar, col_restaurar = st.columns(2)
+
+    with col_arquivar:
+        if not df.empty:
+            ano_arquivar = st.selectbox("Ano a arquivar:", df["Anos"].tolist(), key="ano_arquivar")
+            if st.button("Gerar arquivo do ano", key="btn_arquivar"):
+                try:
+                    with st.spinner(f"Arquivando o ano {ano_arquivar}..."):
+                        totais = arquivamento.arquivar_ano(ano_arquivar)
+                    st.success(f"Arquivo do ano {ano_arquivar} gravado ({sum(totais.values())} linhas).")
+                except Exception as e:
+                    st.error(f"Ocorreu um erro ao arquivar o ano: {e}")
+
+    with col_restaurar:
+        anos_arquivados = arquivamento.anos_arquivados()
+        if not anos_arquivados:
+            st.write("Nenhum ano arquivado.")
+        else:
+            ano_restaurar = st.selectbox("Ano a restaurar:", anos_arquivados, key="ano_restaurar")
+            if st.button("Restaurar no banco", key="btn_restaurar"):
+                try:
+                    with st.spinner(f"Restaurando o ano {ano_restaurar}..."):
+                        totais = arquivamento.restaurar_ano(ano_restaurar)
+                    st.success(f"Ano {ano_restaurar} restaurado ({sum(totais.values())} linhas).")
+                except ValueError as e:
+                    st.error(str(e))
+                except Exception as e:
+                    st.error(f"Ocorreu um erro ao restaurar o ano: {e}")
@@ -1,100 +1,82 @@
 # paginas/cadastro_equipe.py
 
 import streamlit as st
-import psycopg2
 from psycopg2 import errors
-from dotenv import load_dotenv
-import os
 import pandas as pd
+from paginas import catalogo, db, importacao, paginacao, tabela
+
+# Quantos caracteres da ficha técnica aparecem na listagem; o texto completo
+# só é buscado quando o usuário pede para ver a ficha de uma equipe
+TAMANHO_PREVIA_FICHA = 120
 
 def show():
     st.write("# Cadastro de Equipes")
 
-    # Carrega as variáveis de ambiente
-    load_dotenv()
-    DB_URL = os.getenv("DB_URL")
-
     # Função para carregar anos disponíveis
     def carregar_anos():
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_ano FROM tbl_anos ORDER BY id_ano;')
-            rows = cursor.fetchall()
-            anos = [r[0] for r in rows]
+            anos = catalogo.carregar_anos()
         except Exception as e:
             st.error(f"Erro ao carregar anos: {e}")
             anos = []
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return anos
 
     # Função para carregar modalidades por ano
     def carregar_modalidades_por_ano(ano):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_modalidade, nome FROM tbl_modalidades WHERE id_ano = %s ORDER BY nome;', (ano,))
-            rows = cursor.fetchall()
-            modalidades = rows  # (id_modalidade, nome)
+            modalidades = catalogo.carregar_modalidades(ano)  # (id_modalidade, nome)
         except Exception as e:
             st.error(f"Erro ao carregar modalidades: {e}")
             modalidades = []
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return modalidades
 
-    # Função para carregar equipes
-    def carregar_equipes():
+    # Função para carregar uma página das equipes de uma modalidade, a partir do
+    # cursor (ordem_apresentacao, id_equipe) da página anterior
+    # (da ficha técnica vêm apenas a prévia e o tamanho do texto)
+    def carregar_equipes(id_modalidade, apos=None, tamanho=paginacao.TAMANHO_PAGINA):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            query = '''
+            filtro, params_filtro = paginacao.filtro_keyset(["ordem_apresentacao", "id_equipe"], apos)
+            query = f'''
                 SELECT 
                     id_equipe, 
-                    id_modalidade, 
                     nome, 
                     ordem_apresentacao,
                     grau,
-                    ficha_tecnica
-                FROM tbl_equipes;
+                    LEFT(ficha_tecnica, %s) AS ficha_previa,
+                    COALESCE(LENGTH(ficha_tecnica), 0) AS ficha_tamanho
+                FROM tbl_equipes
+                WHERE id_modalidade = %s AND {filtro}
+                ORDER BY ordem_apresentacao, id_equipe
+                LIMIT %s;
             '''
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            colunas = [desc[0] for desc in cursor.description]
-            df = pd.DataFrame(rows, columns=colunas)
+            df = db.consultar_df(query, (TAMANHO_PREVIA_FICHA, int(id_modalidade), *params_filtro, tamanho + 1))
+            # Prévia exibida, com reticências quando o texto foi cortado
+            previa = df["ficha_previa"].fillna("")
+            df["ficha"] = previa + (df["ficha_tamanho"] > previa.str.len()).map({True: "…", False: ""})
         except Exception as e:
             st.error(f"Erro ao carregar equipes: {e}")
             df = pd.DataFrame()
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return df
 
-    # Função para apagar equipe
-    def apagar_equipe(id_equipe):
+    # Função para carregar a ficha técnica completa das equipes informadas
+    def carregar_fichas_tecnicas(ids_equipes):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            delete_query = "DELETE FROM tbl_equipes WHERE id_equipe = %s;"
-            cursor.execute(delete_query, (id_equipe,))
-            conn.commit()
-            st.success("Equipe apagada com sucesso.")
+            query = 'SELECT nome, ficha_tecnica FROM tbl_equipes WHERE id_equipe = ANY(%s) ORDER BY ordem_apresentacao, id_equipe;'
+            return db.consultar(query, ([int(i) for i in ids_equipes],))
         except Exception as e:
-            st.error(f"Ocorreu um erro ao apagar a equipe: {e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+            st.error(f"Erro ao carregar a ficha técnica: {e}")
+            return []
+
+    # Função para apagar as equipes selecionadas em um único comando
+    def apagar_equipes(ids_equipes):
+        try:
+            delete_query = "DELETE FROM tbl_equipes WHERE id_equipe = ANY(%s);"
+            apagados = db.executar(delete_query, ([int(i) for i in ids_equipes],))
+            st.toast(f"{apagados} equipe(s) apagada(s) com sucesso.")
+            return True
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao apagar as equipes: {e}")
+            return False
 
     # Carregar anos disponíveis
     anos_disponiveis = carregar_anos()
@@ -105,6 +87,13 @@ def show():
         # Combobox para selecionar o ano
         ano_selecionado = st.selectbox("Selecione o ano para cadastrar e visualizar equipes:", anos_disponiveis)
 
+        # Importação de várias equipes de uma vez, para qualquer modalidade do ano
+        importacao.secao_importacao(
+            f"equipes_{ano_selecionado}",
+            importacao.COLUNAS_EQUIPES,
+            lambda df: importacao.importar_equipes(df, ano_selecionado),
+        )
+
         # Carregar modalidades para o ano selecionado
         modalidades = carregar_modalidades_por_ano(ano_selecionado)
         if not modalidades:
@@ -143,15 +132,12 @@ def show():
                             st.stop()
 
                         try:
-                            conn = psycopg2.connect(DB_URL)
-                            cursor = conn.cursor()
                             query = """
                                 INSERT INTO tbl_equipes 
                                     (nome, ordem_apresentacao, id_modalidade, grau, ficha_tecnica) 
                                 VALUES (%s, %s, %s, %s, %s)
                             """
-                            cursor.execute(query, (nome_equipe, ordem_int, id_modalidade_selecionada, grau_selecionado, ficha_tecnica))
-                            conn.commit()
+                            db.executar(query, (nome_equipe, ordem_int, id_modalidade_selecionada, grau_selecionado, ficha_tecnica))
                             st.success(f"Equipe '{nome_equipe}' inserida com sucesso na modalidade '{modalidade_selecionada_nome}'!")
                             # Limpar os campos após o sucesso
                             st.session_state['nome_equipe'] = ""
@@ -162,50 +148,31 @@ def show():
                             st.error(f"Erro: A equipe '{nome_equipe}' já existe nessa modalidade.")
                         except Exception as e:
                             st.error(f"Ocorreu um erro ao inserir a equipe: {e}")
-                        finally:
-                            if cursor:
-                                cursor.close()
-                            if conn:
-                                conn.close()
                     else:
                         st.warning("Por favor, preencha todos os campos.")
 
             st.markdown("---")
             st.title("Equipes Cadastradas")
 
-            # Apagar equipe se houver
-            if 'delete_equipe' in st.session_state:
-                apagar_equipe(st.session_state['delete_equipe']['id_equipe'])
-                del st.session_state['delete_equipe']
-
-            # Carregar equipes
-            df_equipes = carregar_equipes()
-            df_filtrado = df_equipes[df_equipes["id_modalidade"] == id_modalidade_selecionada]
+            # Carregar apenas a página atual das equipes
+            chave = f"equipes_{id_modalidade_selecionada}"
+            df_filtrado = carregar_equipes(id_modalidade_selecionada, paginacao.cursor_atual(chave))
+            df_filtrado, tem_proxima = paginacao.recortar(df_filtrado)
 
-            if df_filtrado.empty:
+            if df_filtrado.empty and paginacao.numero_pagina(chave) == 1:
                 st.write(f"Não há equipes cadastradas para a modalidade '{modalidade_selecionada_nome}'.")
             else:
-                # Cabeçalhos da tabela
-                col_tit_nome, col_tit_ordem, col_tit_grau, col_tit_ficha, col_tit_acao = st.columns([2,1,1,3,1])
-                col_tit_nome.write("**Nome**")
-                col_tit_ordem.write("**Ordem**")
-                col_tit_grau.write("**Grau**")
-                col_tit_ficha.write("**Ficha Técnica**")
-                col_tit_acao.write("**Ação**")
-
-                # Exibir equipes
-                for index, row in df_filtrado.iterrows():
-                    id_equipe_val = row["id_equipe"]
-                    nome_val = row["nome"]
-                    ordem_val = row["ordem_apresentacao"]
-                    grau_val = row["grau"]
-                    ficha_val = row["ficha_tecnica"]
-
-                    col_nome, col_ordem, col_grau, col_ficha, col_acao = st.columns([2,1,1,3,1])
-                    col_nome.write(nome_val)
-                    col_ordem.write(ordem_val)
-                    col_grau.write(grau_val)
-                    col_ficha.write(ficha_val)
-
-                    if col_acao.button("Apagar", key=f"apagar_{id_equipe_val}"):
-                        st.session_state['delete_equipe'] = {"id_equipe": id_equipe_val}
+                paginacao.navegacao(chave, df_filtrado, ["ordem_apresentacao", "id_equipe"], tem_proxima)
+
+                chave_pagina = f"{chave}_{paginacao.numero_pagina(chave)}"
+                selecionados = tabela.tabela_selecionavel(
+                    df_filtrado, chave_pagina, "id_equipe",
+                    {"nome": "Nome", "ordem_apresentacao": "Ordem", "grau": "Grau", "ficha": "Ficha Técnica"}
+                )
+                tabela.botao_apagar_selecionados(chave_pagina, selecionados, apagar_equipes)
+
+                # Ficha completa apenas sob demanda, para as equipes selecionadas
+                if selecionados and st.checkbox("Ver ficha técnica completa das equipes selecionadas", key=f"fichas_{chave_pagina}"):
+                    for nome_val, ficha_val in carregar_fichas_tecnicas(selecionados):
+                        st.markdown(f"**{nome_val}**")
+                        st.text(ficha_val or "")
@@ -1,119 +1,72 @@
 import streamlit as st
-import psycopg2
 from psycopg2 import errors
-from dotenv import load_dotenv
-import os
 import pandas as pd
+from paginas import catalogo, db, importacao, paginacao, tabela
 
 def show():
     st.write("# Cadastro de Participantes")
 
-    # Carrega as variáveis de ambiente
-    load_dotenv()
-    DB_URL = os.getenv("DB_URL")
-
     # Função para carregar anos disponíveis
     def carregar_anos():
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_ano FROM tbl_anos ORDER BY id_ano;')
-            rows = cursor.fetchall()
-            anos = [r[0] for r in rows]
+            anos = catalogo.carregar_anos()
         except Exception as e:
             st.error(f"Erro ao carregar anos: {e}")
             anos = []
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return anos
 
     # Função para carregar modalidades por ano
     def carregar_modalidades_por_ano(ano):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_modalidade, nome FROM tbl_modalidades WHERE id_ano = %s ORDER BY nome;', (ano,))
-            rows = cursor.fetchall()
-            modalidades = rows  # (id_modalidade, nome)
+            modalidades = catalogo.carregar_modalidades(ano)  # (id_modalidade, nome)
         except Exception as e:
             st.error(f"Erro ao carregar modalidades: {e}")
             modalidades = []
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return modalidades
 
     # Função para carregar equipes por modalidade e grau
     def carregar_equipes_por_modalidade_e_grau(id_modalidade, grau):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_equipe, nome FROM tbl_equipes WHERE id_modalidade = %s AND grau = %s ORDER BY nome;', (id_modalidade, grau))
-            rows = cursor.fetchall()
+            rows = db.consultar('SELECT id_equipe, nome FROM tbl_equipes WHERE id_modalidade = %s AND grau = %s ORDER BY nome;', (id_modalidade, grau))
             equipes = rows  # (id_equipe, nome)
         except Exception as e:
             st.error(f"Erro ao carregar equipes: {e}")
             equipes = []
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return equipes
 
-    # Função para carregar participantes com dados da equipe (incluindo grau)
-    def carregar_participantes(grau_filtro):
+    # Função para carregar uma página dos participantes de uma equipe com o grau da equipe,
+    # a partir do cursor (nome, id_participante) da página anterior
+    def carregar_participantes(id_equipe, apos=None, tamanho=paginacao.TAMANHO_PAGINA):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            query = '''
+            filtro, params_filtro = paginacao.filtro_keyset(["p.nome", "p.id_participante"], apos)
+            query = f'''
                 SELECT 
                     p.id_participante, 
                     p.nome, 
                     p.turma, 
-                    e.grau, 
-                    p.id_equipe 
+                    e.grau
                 FROM tbl_participantes p
                 JOIN tbl_equipes e ON p.id_equipe = e.id_equipe
-                WHERE LOWER(TRIM(e.grau)) = LOWER(TRIM(%s))
-                ORDER BY p.nome;
+                WHERE p.id_equipe = %s AND {filtro}
+                ORDER BY p.nome, p.id_participante
+                LIMIT %s;
             '''
-            cursor.execute(query, (grau_filtro.strip(),))
-            rows = cursor.fetchall()
-            colunas = [desc[0] for desc in cursor.description]
-            df = pd.DataFrame(rows, columns=colunas)
+            df = db.consultar_df(query, (int(id_equipe), *params_filtro, tamanho + 1))
         except Exception as e:
             st.error(f"Erro ao carregar participantes: {e}")
             df = pd.DataFrame()
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
         return df
 
-    # Função para apagar participante
-    def apagar_participante(id_participante):
+    # Função para apagar os participantes selecionados em um único comando
+    def apagar_participantes(ids_participantes):
         try:
-            conn = psycopg2.connect(DB_URL)
-            cursor = conn.cursor()
-            delete_query = "DELETE FROM tbl_participantes WHERE id_participante = %s;"
-            cursor.execute(delete_query, (id_participante,))
-            conn.commit()
-            st.success("Participante apagado com sucesso.")
-            # Remover st.stop() para permitir que o script continue executando
+            delete_query = "DELETE FROM tbl_participantes WHERE id_participante = ANY(%s);"
+            apagados = db.executar(delete_query, ([int(i) for i in ids_participantes],))
+            st.toast(f"{apagados} participante(s) apagado(s) com sucesso.")
+            return True
         except Exception as e:
-            st.error(f"Ocorreu um erro ao apagar o participante: {e}")
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+            st.error(f"Ocorreu um erro ao apagar os participantes: {e}")
+            return False
 
     # Inicializa um contador para o form key, para resetar o formulário
     if 'form_counter' not in st.session_state:
@@ -134,6 +87,13 @@ def show():
         # Combobox para selecionar o ano
         ano_selecionado = st.selectbox("Selecione o ano para cadastrar e visualizar participantes:", anos_disponiveis)
 
+        # Importação de listas de alunos, para qualquer equipe do ano
+        importacao.secao_importacao(
+            f"participantes_{ano_selecionado}",
+            importacao.COLUNAS_PARTICIPANTES,
+            lambda df: importacao.importar_participantes(df, ano_selecionado),
+        )
+
         # Carregar modalidades para o ano selecionado
         modalidades = carregar_modalidades_por_ano(ano_selecionado)
         if not modalidades:
@@ -177,12 +137,9 @@ def show():
                     if submit_button:
                         if nome_participante.strip() and turma_participante.strip() and id_equipe_selecionada:
                             try:
-                                conn = psycopg2.connect(DB_URL)
-                                cursor = conn.cursor()
                                 # Inserir sem o campo 'grau'
                                 query = "INSERT INTO tbl_participantes (nome, turma, id_equipe) VALUES (%s, %s, %s)"
-                                cursor.execute(query, (nome_participante.strip(), turma_participante.strip(), id_equipe_selecionada))
-                                conn.commit()
+                                db.executar(query, (nome_participante.strip(), turma_participante.strip(), id_equipe_selecionada))
                                 st.success(f"Participante '{nome_participante}' inserido com sucesso na equipe '{equipe_selecionada_nome}'!")
 
                                 # Incrementar o contador para resetar o formulário
@@ -191,51 +148,26 @@ def show():
                                 st.error(f"Erro: O participante '{nome_participante}' já existe nesta equipe.")
                             except Exception as e:
                                 st.error(f"Ocorreu um erro ao inserir o participante: {e}")
-                            finally:
-                                if cursor:
-                                    cursor.close()
-                                if conn:
-                                    conn.close()
                         else:
                             st.warning("Por favor, preencha todos os campos corretamente.")
 
                 st.markdown("---")
                 st.title("Participantes Cadastrados")
 
-                # Apagar participante se houver
-                if 'delete_participante' in st.session_state:
-                    apagar_participante(st.session_state['delete_participante']['id_participante'])
-                    del st.session_state['delete_participante']
-                    # Incrementar o contador para atualizar a lista
-                    st.session_state['form_counter'] += 1
-
-                # Carregar participantes com base no filtro de grau
-                df_participantes = carregar_participantes(grau_filtro)
-
-                # Filtrar participantes pela equipe selecionada
-                df_filtrado = df_participantes[df_participantes["id_equipe"] == id_equipe_selecionada]
+                # Carregar apenas a página atual dos participantes da equipe selecionada
+                chave = f"participantes_{id_equipe_selecionada}"
+                df_filtrado = carregar_participantes(id_equipe_selecionada, paginacao.cursor_atual(chave))
+                df_filtrado, tem_proxima = paginacao.recortar(df_filtrado)
 
-                if df_filtrado.empty:
+                if df_filtrado.empty and paginacao.numero_pagina(chave) == 1:
                     st.write(f"Não há participantes cadastrados para a equipe '{equipe_selecionada_nome}'.")
                 else:
-                    # Cabeçalhos da tabela, exibindo 'Grau da Equipe'
-                    col_tit_nome, col_tit_turma, col_tit_grau, col_tit_acao = st.columns([2,2,1,1])
-                    col_tit_nome.write("**Nome**")
-                    col_tit_turma.write("**Turma**")
-                    col_tit_grau.write("**Grau da Equipe**")
-                    col_tit_acao.write("**Ação**")
-
-                    # Exibir participantes
-                    for index, row in df_filtrado.iterrows():
-                        id_participante_val = row["id_participante"]
-                        nome_val = row["nome"]
-                        turma_val = row["turma"]
-                        grau_val = row["grau"]  # Obtido via JOIN com tbl_equipes
-
-                        col_nome, col_turma, col_grau, col_acao = st.columns([2,2,1,1])
-                        col_nome.write(nome_val)
-                        col_turma.write(turma_val)
-                        col_grau.write(grau_val)
-
-                        if col_acao.button("Apagar", key=f"apagar_{id_participante_val}"):
-                            st.session_state['delete_participante'] = {"id_participante": id_participante_val}
+                    paginacao.navegacao(chave, df_filtrado, ["nome", "id_participante"], tem_proxima)
+
+                    # Grau obtido via JOIN com tbl_equipes
+                    chave_pagina = f"{chave}_{paginacao.numero_pagina(chave)}"
+                    selecionados = tabela.tabela_selecionavel(
+                        df_filtrado, chave_pagina, "id_participante",
+                        {"nome": "Nome", "turma": "Turma", "grau": "Grau da Equipe"}
+                    )
+                    tabela.botao_apagar_selecionados(chave_pagina, selecionados, apagar_participantes)
@@ -0,0 +1,65 @@
+# paginas/catalogo.py
+#
+# Dados de referência usados nas caixas de seleção de quase todas as páginas
+# (anos, modalidades, jurados e critérios). Eles mudam poucas vezes por festival,
+# então ficam em cache no processo: navegar pelos filtros não consulta o banco.
+# As páginas de cadastro chamam invalidar_*() depois de inserir ou apagar; a
+# validade é só uma rede de segurança para alterações feitas fora do app.
+
+import streamlit as st
+from paginas import db
+
+VALIDADE_CATALOGO_SEGUNDOS = 600
+
+
+@st.cache_data(ttl=VALIDADE_CATALOGO_SEGUNDOS, show_spinner=False)
+def carregar_anos():
+    rows = db.consultar('SELECT id_ano FROM tbl_anos ORDER BY id_ano;')
+    return [int(r[0]) for r in rows]
+
+
+# Lista de tuplas (id_modalidade, nome) do ano
+@st.cache_data(ttl=VALIDADE_CATALOGO_SEGUNDOS, show_spinner=False)
+def carregar_modalidades(ano):
+    query = 'SELECT id_modalidade, nome FROM tbl_modalidades WHERE id_ano = %s ORDER BY nome;'
+    rows = db.consultar(query, (int(ano),))
+    return [(int(mid), nome) for mid, nome in rows]
+
+
+# Lista de tuplas (id_jurado, nome); sem ano, todos os jurados cadastrados
+@st.cache_data(ttl=VALIDADE_CATALOGO_SEGUNDOS, show_spinner=False)
+def carregar_jurados(ano=None):
+    if ano is None:
+        rows = db.consultar('SELECT id_jurado, nome FROM tbl_jurados ORDER BY nome;')
+    else:
+        rows = db.consultar('SELECT id_jurado, nome FROM tbl_jurados WHERE id_ano = %s ORDER BY nome;', (int(ano),))
+    return [(int(jid), nome) for jid, nome in rows]
+
+
+# Lista de tuplas (id_criterio, nome) da modalidade
+@st.cache_data(ttl=VALIDADE_CATALOGO_SEGUNDOS, show_spinner=False)
+def carregar_criterios(modalidade):
+    query = 'SELECT id_criterio, nome FROM tbl_criterios WHERE id_modalidade = %s ORDER BY nome;'
+    rows = db.consultar(query, (int(modalidade),))
+    return [(int(cid), nome) for cid, nome in rows]
+
+
+# Apagar um ano remove em cascata as modalidades, jurados e critérios dele
+def invalidar_anos():
+    carregar_anos.clear()
+    invalidar_modalidades()
+    invalidar_jurados()
+
+
+# Apagar uma modalidade remove em cascata os critérios dela
+def invalidar_modalidades():
+    carregar_modalidades.clear()
+    invalidar_criterios()
+
+
+def invalidar_jurados():
+    carregar_jurados.clear()
+
+
+def invalidar_criterios():
+    carregar_criterios.clear()
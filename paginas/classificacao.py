@@ -1,27 +1,15 @@
 import streamlit as st
-import psycopg2
-from psycopg2 import errors
-from dotenv import load_dotenv
-import os
 import pandas as pd
-
-load_dotenv()
-DB_URL = os.getenv("DB_URL")
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+from paginas import arquivamento, catalogo, db, exportacao, nota_final
 
 def show():
     st.title("Classificação")
 
-    def carregar_anos():
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        cursor.execute('SELECT id_ano FROM tbl_anos;')
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        anos = [r[0] for r in rows]
-        return anos
-
-    anos_disponiveis = carregar_anos()
+    # Anos do banco e anos que só existem no arquivo (removidos do banco depois de arquivados)
+    anos_banco = catalogo.carregar_anos()
+    anos_disponiveis = sorted(set(anos_banco) | set(arquivamento.anos_arquivados()))
 
     if not anos_disponiveis:
         st.warning("Não há anos cadastrados. Por favor, cadastre um ano primeiro.")
@@ -29,14 +17,26 @@ def show():
     else:
         ano_selecionado = st.selectbox("Selecione o ano:", anos_disponiveis)
 
+    somente_arquivo = ano_selecionado not in anos_banco
+    if somente_arquivo:
+        st.caption("Este ano só existe no arquivo: a classificação é lida dele, sem acessar o banco.")
+    else:
+        exportacao.secao_exportacao(ano_selecionado)
+
+    # Com o arquivo do ano gravado, a classificação pode ser lida dele sem acessar o banco
+    tabelas_arquivo = None
+    if arquivamento.existe_arquivo(ano_selecionado):
+        if somente_arquivo or st.toggle("Ler do arquivo do ano (somente leitura)", key="classificacao_arquivo"):
+            try:
+                tabelas_arquivo = arquivamento.carregar_arquivo(ano_selecionado)
+            except Exception as e:
+                st.error(f"Erro ao abrir o arquivo do ano: {e}")
+                return
+
     def carregar_modalidades(ano):
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        query = "SELECT id_modalidade, nome FROM tbl_modalidades WHERE id_ano = %s;"
-        cursor.execute(query, (int(ano),))  # Garantir int nativo
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        if tabelas_arquivo is not None:
+            return arquivamento.modalidades_do_arquivo(tabelas_arquivo)
+        rows = catalogo.carregar_modalidades(ano)
         modalidades = pd.DataFrame(rows, columns=["id_modalidade","nome"])
         return modalidades
 
@@ -50,161 +50,139 @@ def show():
     id_modalidade_selecionada = df_modalidades[df_modalidades["nome"] == modalidade_selecionada]["id_modalidade"].values[0]
     id_modalidade_selecionada = int(id_modalidade_selecionada)
 
-    def carregar_jurados_especialistas(ano, modalidade):
-        ano = int(ano)
+    # Participantes de todas as equipes da modalidade em uma única consulta,
+    # já agrupados por equipe: {id_equipe: [nomes em ordem alfabética]}
+    def carregar_participantes_por_modalidade(modalidade):
         modalidade = int(modalidade)
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
         query = """
-            SELECT id_jurado 
-            FROM tbl_especialistas
-            WHERE id_ano = %s AND id_modalidade = %s
+            SELECT p.id_equipe, array_agg(p.nome ORDER BY p.nome)
+            FROM tbl_participantes p
+            JOIN tbl_equipes eq ON eq.id_equipe = p.id_equipe
+            WHERE eq.id_modalidade = %s
+            GROUP BY p.id_equipe
         """
-        cursor.execute(query, (ano, modalidade))
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        especialistas = [r[0] for r in rows]
-        return especialistas
-
-    def carregar_equipes_por_modalidade(modalidade):
+        rows = db.consultar(query, (modalidade,))
+        participantes = {id_equipe: nomes for id_equipe, nomes in rows}
+        return participantes
+
+    # Calcula a nota final de todas as equipes da modalidade em uma única consulta
+    # (fórmula em paginas/nota_final.py)
+    def calcular_notas_finais(cursor, ano, modalidade):
+        ano = int(ano)
         modalidade = int(modalidade)
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        query = """
-            SELECT id_equipe, nome, grau 
-            FROM tbl_equipes
-            WHERE id_modalidade = %s
-            ORDER BY grau, nome;
-        """
-        cursor.execute(query, (modalidade,))
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        df = pd.DataFrame(rows, columns=["id_equipe", "nome_equipe", "grau"])
+        cursor.execute(nota_final.QUERY_MODALIDADE, {"ano": ano, "modalidade": modalidade})
+        df = pd.DataFrame(cursor.fetchall(), columns=["id_equipe", "nome_equipe", "grau", "nota_final"])
+        df["nota_final"] = df["nota_final"].astype(float)
         return df
 
-    def carregar_participantes_por_equipe(equipe_id):
-        equipe_id = int(equipe_id)
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        query = """
-            SELECT nome
-            FROM tbl_participantes
-            WHERE id_equipe = %s
-        """
-        cursor.execute(query, (equipe_id,))
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        participantes = [r[0] for r in rows]
-        return participantes
-
-    def carregar_notas(ano, modalidade, equipe_id):
+    # Grava as notas finais da modalidade inteira em um único upsert.
+    # O WHERE do ON CONFLICT pula as equipes cuja nota não mudou, para não gerar
+    # versões mortas de linhas (e WAL) a cada visualização da página.
+    def salvar_classificacoes(cursor, ano, modalidade, df_notas):
         ano = int(ano)
         modalidade = int(modalidade)
-        equipe_id = int(equipe_id)
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
+        linhas = [
+            (float(nota_final), ano, modalidade, int(id_equipe))
+            for id_equipe, nota_final in zip(df_notas["id_equipe"], df_notas["nota_final"])
+        ]
+        if not linhas:
+            return
         query = """
-            SELECT id_jurado, id_criterio, nota
-            FROM tbl_notas
-            WHERE id_ano = %s AND id_modalidade = %s AND id_equipe = %s
-              AND status = 'ok'
+            INSERT INTO tbl_classificacoes (nota_final, id_ano, id_modalidade, id_equipe)
+            VALUES %s
+            ON CONFLICT (id_ano, id_modalidade, id_equipe) DO UPDATE
+            SET nota_final = EXCLUDED.nota_final
+            WHERE tbl_classificacoes.nota_final IS DISTINCT FROM EXCLUDED.nota_final
         """
-        cursor.execute(query, (ano, modalidade, equipe_id))
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        return rows
-
-    def calcular_nota_final(ano, modalidade, equipe_id):
-        especialistas = carregar_jurados_especialistas(ano, modalidade)
-        notas_equipe = carregar_notas(ano, modalidade, equipe_id)
-
-        if not notas_equipe:
-            return 0.0
-
-        from collections import defaultdict
-        notas_por_jurado = defaultdict(list)
-        for (id_jurado, id_criterio, nota) in notas_equipe:
-            notas_por_jurado[id_jurado].append(nota)
+        execute_values(cursor, query, linhas, page_size=len(linhas))
 
-        # Calcula média de critérios por jurado
-        medias_jurados = {}
-        for jurado, lista_notas in notas_por_jurado.items():
-            medias_jurados[jurado] = sum(lista_notas) / len(lista_notas) if len(lista_notas) > 0 else 0.0
-
-        # Separa jurados especialistas e gerais
-        especialistas = set(especialistas)  # Para otimizar pesquisa
-        notas_especialistas = [m for j,m in medias_jurados.items() if j in especialistas]
-        notas_gerais = [m for j,m in medias_jurados.items() if j not in especialistas]
-
-        G = len(notas_gerais)
-        E = len(notas_especialistas)
-
-        # Média dos jurados gerais
-        media_geral = sum(notas_gerais)/G if G > 0 else 0.0
-        # Soma das notas dos jurados especialistas
-        soma_especialistas = sum(notas_especialistas)
-
-        # Cálculo da nota final conforme o exemplo solicitado
-        nota_final = (media_geral + soma_especialistas) / (E + 1) if (E > 0 or G > 0) else 0.0
+    # Versão atual das notas da modalidade e versão usada no último cálculo salvo.
+    # Retorna None se o marcador ainda não foi instalado (migracoes/0003_notas_versao.sql).
+    def carregar_versao(ano, modalidade):
+        query = """
+            SELECT versao, versao_classificacao
+            FROM tbl_notas_versao
+            WHERE id_ano = %s AND id_modalidade = %s
+        """
+        try:
+            rows = db.consultar(query, (int(ano), int(modalidade)))
+        except errors.UndefinedTable:
+            return None
+        # Modalidade sem nenhuma nota: nada a recalcular
+        return rows[0] if rows else (0, 0)
+
+    # Classificação gravada na tbl_classificacoes, sem recalcular nada
+    def carregar_classificacao_salva(ano, modalidade):
+        query = """
+            SELECT eq.id_equipe, eq.nome, eq.grau, COALESCE(c.nota_final, 0)
+            FROM tbl_equipes eq
+            LEFT JOIN tbl_classificacoes c
+                ON c.id_equipe = eq.id_equipe
+                AND c.id_ano = %(ano)s
+                AND c.id_modalidade = %(modalidade)s
+            WHERE eq.id_modalidade = %(modalidade)s
+            ORDER BY eq.grau, eq.nome;
+        """
+        rows = db.consultar(query, {"ano": int(ano), "modalidade": int(modalidade)})
+        df = pd.DataFrame(rows, columns=["id_equipe", "nome_equipe", "grau", "nota_final"])
+        df["nota_final"] = df["nota_final"].astype(float)
+        return df
 
-        return nota_final
+    # Recalcula e grava a classificação da modalidade em uma transação.
+    # O FOR UPDATE no marcador serializa o cálculo entre as sessões: quem chega
+    # depois encontra a versão já atualizada e apenas lê o que foi gravado.
+    def atualizar_classificacao(ano, modalidade, com_marcador=True):
+        with db.get_cursor() as cursor:
+            versao = None
+            if com_marcador:
+                cursor.execute("""
+                    SELECT versao, versao_classificacao
+                    FROM tbl_notas_versao
+                    WHERE id_ano = %s AND id_modalidade = %s
+                    FOR UPDATE
+                """, (int(ano), int(modalidade)))
+                versao = cursor.fetchone()
+                if versao and versao[0] == versao[1]:
+                    return None
+
+            df = calcular_notas_finais(cursor, ano, modalidade)
+            salvar_classificacoes(cursor, ano, modalidade, df)
+
+            if versao:
+                cursor.execute("""
+                    UPDATE tbl_notas_versao
+                    SET versao_classificacao = %s
+                    WHERE id_ano = %s AND id_modalidade = %s
+                """, (versao[0], int(ano), int(modalidade)))
+        return df
 
-    def salvar_classificacao(ano, modalidade, equipe_id, nota_final):
-        ano = int(ano)
-        modalidade = int(modalidade)
-        equipe_id = int(equipe_id)
-        conn = psycopg2.connect(DB_URL)
-        cursor = conn.cursor()
-        # Verifica se já existe um registro para essa combinação
-        query_check = """
-            SELECT id_classificacao FROM tbl_classificacoes
-            WHERE id_ano = %s AND id_modalidade = %s AND id_equipe = %s
-        """
-        cursor.execute(query_check, (ano, modalidade, equipe_id))
-        result = cursor.fetchone()
-        if result:
-            # Atualiza o registro existente
-            query_update = """
-                UPDATE tbl_classificacoes
-                SET nota_final = %s
-                WHERE id_classificacao = %s
-            """
-            cursor.execute(query_update, (float(nota_final), result[0]))
-        else:
-            # Insere um novo registro
-            query_insert = """
-                INSERT INTO tbl_classificacoes (nota_final, id_ano, id_modalidade, id_equipe)
-                VALUES (%s, %s, %s, %s)
-            """
-            cursor.execute(query_insert, (float(nota_final), ano, modalidade, equipe_id))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-    df_equipes = carregar_equipes_por_modalidade(id_modalidade_selecionada)
+    # Só recalcula (e grava) quando as notas da modalidade mudaram desde o último cálculo
+    versao = None if tabelas_arquivo is not None else carregar_versao(ano_selecionado, id_modalidade_selecionada)
+    if tabelas_arquivo is not None:
+        df_equipes = arquivamento.classificacao_do_arquivo(tabelas_arquivo, id_modalidade_selecionada)
+    elif versao is None:
+        # Marcador não instalado: recalcula a cada visualização
+        df_equipes = atualizar_classificacao(ano_selecionado, id_modalidade_selecionada, com_marcador=False)
+    elif versao[0] != versao[1]:
+        df_equipes = atualizar_classificacao(ano_selecionado, id_modalidade_selecionada)
+        if df_equipes is None:
+            df_equipes = carregar_classificacao_salva(ano_selecionado, id_modalidade_selecionada)
+    else:
+        df_equipes = carregar_classificacao_salva(ano_selecionado, id_modalidade_selecionada)
 
     if df_equipes.empty:
         st.write("Não há equipes cadastradas para esta modalidade.")
         return
 
-    # Calcula a nota final e salva na tabela tbl_classificacoes
-    df_equipes["nota_final"] = df_equipes.apply(
-        lambda row: calcular_nota_final(ano_selecionado, id_modalidade_selecionada, row["id_equipe"]), axis=1
-    )
-
-    # Salva cada nota final na tbl_classificacoes
-    for _, row in df_equipes.iterrows():
-        salvar_classificacao(ano_selecionado, id_modalidade_selecionada, row["id_equipe"], row["nota_final"])
-
     # Agora monta a estrutura de classificação
     nome_modalidade = modalidade_selecionada
     st.write(f"## Modalidade: {nome_modalidade}")
 
+    if tabelas_arquivo is not None:
+        participantes_por_equipe = arquivamento.participantes_do_arquivo(tabelas_arquivo, id_modalidade_selecionada)
+    else:
+        participantes_por_equipe = carregar_participantes_por_modalidade(id_modalidade_selecionada)
+
     grupos_grau = df_equipes["grau"].unique()
     for grau in grupos_grau:
         st.write(f"### Grau: {grau}")
@@ -214,10 +192,10 @@ def show():
 
         for _, eq_row in df_grau.iterrows():
             equipe_nome = eq_row["nome_equipe"]
-            nota_final = eq_row["nota_final"]
-            participantes = carregar_participantes_por_equipe(eq_row["id_equipe"])
+            nota = eq_row["nota_final"]
+            participantes = participantes_por_equipe.get(int(eq_row["id_equipe"]), [])
 
-            st.write(f"**{equipe_nome}** - Nota: {nota_final:.3f}")
+            st.write(f"**{equipe_nome}** - Nota: {nota:.3f}")
             for p in participantes:
                 st.write(f"- {p}")
             st.write("---")
@@ -0,0 +1,9 @@
+# paginas/config.py
+#
+# Carrega o .env uma única vez por processo. Os módulos que leem variáveis de
+# ambiente no import (db, instrumentacao, arquivamento) importam este antes:
+# assim a ordem em que as páginas são carregadas não muda a configuração.
+
+from dotenv import load_dotenv
+
+load_dotenv()
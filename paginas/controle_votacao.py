@@ -1,65 +1,50 @@
+import time
+from collections import OrderedDict
+
 import streamlit as st
-import psycopg2
-from psycopg2 import errors
-from dotenv import load_dotenv
-import os
 import pandas as pd
+from paginas import catalogo, db, instrumentacao, notificacoes, paginacao
+
+# Modo sob demanda: quantos painéis de equipe cada sessão mantém em cache
+# e por quanto tempo os detalhes carregados são reaproveitados
+MAX_PAINEIS_EM_CACHE = 10
+VALIDADE_PAINEL_SEGUNDOS = 30
+# Mesmo com os avisos ativos, detalhes mais antigos que isso são recarregados
+# (rede de segurança contra avisos perdidos)
+IDADE_MAXIMA_PAINEL_SEGUNDOS = 300
+
+# Quantos jurados (cada um com todas as suas notas) aparecem por página no painel de uma equipe
+JURADOS_POR_PAGINA = 10
+
+# Com as notas ao vivo, de quanto em quanto tempo os painéis abertos conferem se
+# chegou aviso de alteração para a sua equipe (a conferência não consulta o banco)
+INTERVALO_AO_VIVO_SEGUNDOS = 3
+# Quantos painéis, no máximo, se atualizam sozinhos ao mesmo tempo
+MAX_PAINEIS_AO_VIVO = 10
+
+# Título no menu (main.py), usado no perfil das reexecuções dos fragmentos
+PAGINA = "Gerenciar Votação"
 
 def show():
     st.write("# Controle das Votações")
     
-    # Carrega as variáveis de ambiente
-    load_dotenv()
-    DB_URL = os.getenv("DB_URL")
-    
-    # Função para conectar ao banco de dados
-    def get_connection():
-        try:
-            conn = psycopg2.connect(DB_URL)
-            return conn
-        except Exception as e:
-            st.error(f"Erro na conexão com o banco de dados: {e}")
-            return None
-    
     # Função para carregar anos disponíveis
     def carregar_anos():
         try:
-            conn = get_connection()
-            if not conn:
-                return []
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_ano FROM tbl_anos ORDER BY id_ano;')
-            rows = cursor.fetchall()
-            anos = [r[0] for r in rows]
+            anos = catalogo.carregar_anos()
             return anos
         except Exception as e:
             st.error(f"Erro ao carregar anos: {e}")
             return []
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
     
     # Função para carregar modalidades por ano
     def carregar_modalidades(ano):
         try:
-            conn = get_connection()
-            if not conn:
-                return []
-            cursor = conn.cursor()
-            cursor.execute('SELECT id_modalidade, nome FROM tbl_modalidades WHERE id_ano = %s ORDER BY nome;', (ano,))
-            rows = cursor.fetchall()
-            modalidades = rows  # (id_modalidade, nome)
+            modalidades = catalogo.carregar_modalidades(ano)  # (id_modalidade, nome)
             return modalidades
         except Exception as e:
             st.error(f"Erro ao carregar modalidades: {e}")
             return []
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
     
     # Função para carregar graus disponíveis
     def carregar_graus():
@@ -69,10 +54,6 @@ def show():
     # Função para carregar equipes com base nos filtros (corrigido)
     def carregar_equipes(id_modalidade, grau):
         try:
-            conn = get_connection()
-            if not conn:
-                return pd.DataFrame()
-            cursor = conn.cursor()
             query = '''
                 SELECT 
                     id_equipe, 
@@ -83,215 +64,211 @@ def show():
                 WHERE id_modalidade = %s AND LOWER(grau) = LOWER(%s)
                 ORDER BY ordem_apresentacao;
             '''
-            cursor.execute(query, (id_modalidade, grau))
-            rows = cursor.fetchall()
-            colunas = [desc[0] for desc in cursor.description]
-            df = pd.DataFrame(rows, columns=colunas)
+            df = db.consultar_df(query, (id_modalidade, grau))
             return df
         except Exception as e:
             st.error(f"Erro ao carregar equipes: {e}")
             return pd.DataFrame()
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
-    
-    # Função para carregar participantes de uma equipe
-    def carregar_participantes(id_equipe):
+    
+    # Função para carregar equipes específicas (usada para recarregar um único painel)
+    def carregar_equipes_por_id(ids_equipes):
         try:
-            conn = get_connection()
-            if not conn:
-                return pd.DataFrame()
-            cursor = conn.cursor()
             query = '''
-                SELECT 
-                    p.nome, 
-                    p.turma 
-                FROM tbl_participantes p
-                WHERE p.id_equipe = %s
-                ORDER BY p.nome;
+                SELECT
+                    id_equipe,
+                    nome,
+                    ordem_apresentacao,
+                    status_votacao
+                FROM tbl_equipes
+                WHERE id_equipe = ANY(%s)
+                ORDER BY ordem_apresentacao;
             '''
-            cursor.execute(query, (id_equipe,))
-            rows = cursor.fetchall()
-            colunas = [desc[0] for desc in cursor.description]
-            df = pd.DataFrame(rows, columns=colunas)
+            df = db.consultar_df(query, ([int(i) for i in ids_equipes],))
             return df
         except Exception as e:
-            st.error(f"Erro ao carregar participantes: {e}")
+            st.error(f"Erro ao carregar equipes: {e}")
             return pd.DataFrame()
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
     
-    # Função para carregar jurados de um ano
-    def carregar_jurados(id_ano):
+    # Função para carregar os participantes de várias equipes em uma única consulta
+    # Retorna {id_equipe: [(nome, turma), ...]} em ordem alfabética
+    def carregar_participantes(ids_equipes):
         try:
-            conn = get_connection()
-            if not conn:
-                return []
-            cursor = conn.cursor()
             query = '''
-                SELECT id_jurado, nome 
-                FROM tbl_jurados 
-                WHERE id_ano = %s
-                ORDER BY nome;
+                SELECT 
+                    p.id_equipe, 
+                    array_agg(p.nome ORDER BY p.nome), 
+                    array_agg(p.turma ORDER BY p.nome) 
+                FROM tbl_participantes p
+                WHERE p.id_equipe = ANY(%s)
+                GROUP BY p.id_equipe;
             '''
-            cursor.execute(query, (id_ano,))
-            rows = cursor.fetchall()
-            jurados = rows  # (id_jurado, nome)
-            return jurados
+            rows = db.consultar(query, ([int(i) for i in ids_equipes],))
+            participantes = {id_equipe: list(zip(nomes, turmas)) for id_equipe, nomes, turmas in rows}
+            return participantes
         except Exception as e:
-            st.error(f"Erro ao carregar jurados: {e}")
-            return []
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
-    
-    # Função para carregar critérios de uma modalidade e ano
-    def carregar_criterios(id_modalidade):
+            st.error(f"Erro ao carregar participantes: {e}")
+            return {}
+    
+    # Função para carregar as notas de várias equipes em uma única consulta.
+    # Por equipe vêm no máximo JURADOS_POR_PAGINA + 1 jurados, a partir do cursor da
+    # equipe em cursores ({id_equipe: (nome do jurado, id_jurado) ou None}); o jurado
+    # extra só indica que há uma próxima página.
+    def carregar_notas(cursores):
         try:
-            conn = get_connection()
-            if not conn:
-                return []
-            cursor = conn.cursor()
+            # Um cursor de página (nome, id_jurado) por equipe, NULL na primeira página,
+            # para buscar todas as equipes na mesma consulta
+            ids_equipes = [int(i) for i in cursores]
+            nomes_apos = [apos[0] if apos else None for apos in cursores.values()]
+            jurados_apos = [int(apos[1]) if apos else None for apos in cursores.values()]
             query = '''
-                SELECT id_criterio, nome 
-                FROM tbl_criterios 
-                WHERE id_modalidade = %s
-                ORDER BY nome;
+                WITH cursores AS (
+                    SELECT *
+                    FROM unnest(%(equipes)s::int[], %(nomes_apos)s::text[], %(jurados_apos)s::int[])
+                        AS c(id_equipe, nome_apos, id_jurado_apos)
+                ),
+                jurados_pagina AS (
+                    SELECT id_equipe, id_jurado
+                    FROM (
+                        SELECT
+                            ej.id_equipe,
+                            ej.id_jurado,
+                            ROW_NUMBER() OVER (PARTITION BY ej.id_equipe ORDER BY j.nome, ej.id_jurado) AS posicao
+                        FROM (
+                            SELECT DISTINCT id_equipe, id_jurado
+                            FROM tbl_notas
+                            WHERE id_equipe = ANY(%(equipes)s)
+                        ) ej
+                        JOIN cursores cu ON cu.id_equipe = ej.id_equipe
+                        JOIN tbl_jurados j ON j.id_jurado = ej.id_jurado
+                        WHERE cu.nome_apos IS NULL
+                           OR (j.nome, ej.id_jurado) > (cu.nome_apos, cu.id_jurado_apos)
+                    ) numerados
+                    WHERE posicao <= %(limite)s
+                )
+                SELECT 
+                    n.id_equipe,
+                    j.id_jurado,
+                    j.nome AS jurado, 
+                    n.status, 
+                    c.nome AS criterio, 
+                    CASE 
+                        WHEN e.id_jurado IS NOT NULL THEN 'Sim' 
+                        ELSE 'Não' 
+                    END AS especialista, 
+                    n.nota
+                FROM tbl_notas n
+                JOIN jurados_pagina jp ON jp.id_equipe = n.id_equipe AND jp.id_jurado = n.id_jurado
+                JOIN tbl_jurados j ON n.id_jurado = j.id_jurado
+                JOIN tbl_criterios c ON n.id_criterio = c.id_criterio
+                LEFT JOIN tbl_especialistas e 
+                    ON j.id_jurado = e.id_jurado 
+                    AND c.id_modalidade = e.id_modalidade 
+                    AND e.id_ano = n.id_ano
+                ORDER BY n.id_equipe, j.nome, j.id_jurado, c.nome;
             '''
-            cursor.execute(query, (id_modalidade,))
-            rows = cursor.fetchall()
-            criterios = rows  # (id_criterio, nome)
-            return criterios
+            params = {"equipes": ids_equipes, "nomes_apos": nomes_apos, "jurados_apos": jurados_apos,
+                      "limite": JURADOS_POR_PAGINA + 1}
+            df = db.consultar_df(query, params)
+            return df
+        except Exception as e:
+            st.error(f"Erro ao carregar notas: {e}")
+            return pd.DataFrame()
+    
+    # Função para carregar jurados de um ano
+    def carregar_jurados(id_ano):
+        try:
+            jurados = catalogo.carregar_jurados(id_ano)  # (id_jurado, nome)
+            return jurados
         except Exception as e:
-            st.error(f"Erro ao carregar critérios: {e}")
+            st.error(f"Erro ao carregar jurados: {e}")
             return []
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
-    
-    # Função para iniciar votação
-    def iniciar_votacao(id_ano, id_modalidade, id_equipe):
+    
+    # Função para iniciar votação de uma ou mais equipes
+    # As cédulas (jurado x critério) são criadas no servidor com um único INSERT ... SELECT,
+    # na mesma transação que muda o status das equipes
+    def iniciar_votacao(id_ano, id_modalidade, ids_equipes):
+        ids_equipes = [int(i) for i in ids_equipes]
         try:
-            conn = get_connection()
-            if not conn:
-                return
-            cursor = conn.cursor()
-            # Atualizar status_votacao para 'votando'
-            update_query = '''
-                UPDATE tbl_equipes 
-                SET status_votacao = 'votando' 
-                WHERE id_equipe = %s;
-            '''
-            cursor.execute(update_query, (id_equipe,))
-            
-            # Obter jurados e critérios
-            jurados = carregar_jurados(id_ano)
-            criterios = carregar_criterios(id_modalidade)
-            
-            # Inserir registros na tbl_notas
-            insert_query = '''
-                INSERT INTO tbl_notas (status, nota, id_ano, id_modalidade, id_equipe, id_jurado, id_criterio)
-                VALUES (%s, %s, %s, %s, %s, %s, %s);
-            '''
-            for jurado in jurados:
-                id_jurado, nome_jurado = jurado
-                for criterio in criterios:
-                    id_criterio, nome_criterio = criterio
-                    cursor.execute(insert_query, ('liberado', None, id_ano, id_modalidade, id_equipe, id_jurado, id_criterio))
-            
-            conn.commit()
-            st.success("Votação iniciada com sucesso para a equipe.")
-            st.experimental_rerun()  # Força a atualização da página após iniciar a votação
+            with db.get_cursor() as cursor:
+                query = '''
+                    WITH equipes AS (
+                        UPDATE tbl_equipes 
+                        SET status_votacao = 'votando' 
+                        WHERE id_equipe = ANY(%(equipes)s)
+                          AND LOWER(COALESCE(status_votacao, '')) <> 'votando'
+                        RETURNING id_equipe
+                    )
+                    INSERT INTO tbl_notas (status, nota, id_ano, id_modalidade, id_equipe, id_jurado, id_criterio)
+                    SELECT 'liberado', NULL, %(ano)s, %(modalidade)s, eq.id_equipe, j.id_jurado, c.id_criterio
+                    FROM equipes eq
+                    CROSS JOIN tbl_jurados j
+                    CROSS JOIN tbl_criterios c
+                    WHERE j.id_ano = %(ano)s
+                      AND c.id_modalidade = %(modalidade)s
+                      AND NOT EXISTS (
+                          SELECT 1 FROM tbl_notas n
+                          WHERE n.id_equipe = eq.id_equipe
+                            AND n.id_jurado = j.id_jurado
+                            AND n.id_criterio = c.id_criterio
+                      );
+                '''
+                cursor.execute(query, {"equipes": ids_equipes, "ano": int(id_ano), "modalidade": int(id_modalidade)})
         except Exception as e:
             st.error(f"Erro ao iniciar votação: {e}")
-            conn.rollback()
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
+            return False
+        if len(ids_equipes) == 1:
+            st.toast("Votação iniciada com sucesso para a equipe.")
+        else:
+            st.toast(f"Votação iniciada com sucesso para {len(ids_equipes)} equipes.")
+        return True
     
     # Função para resetar votação
     def resetar_votacao(id_equipe):
         try:
-            conn = get_connection()
-            if not conn:
-                return
-            cursor = conn.cursor()
-            # Atualizar status_votacao para 'aguardando'
-            update_query = '''
-                UPDATE tbl_equipes 
-                SET status_votacao = 'aguardando' 
-                WHERE id_equipe = %s;
-            '''
-            cursor.execute(update_query, (id_equipe,))
-            
-            # Deletar registros na tbl_notas
-            delete_query = '''
-                DELETE FROM tbl_notas 
-                WHERE id_equipe = %s;
-            '''
-            cursor.execute(delete_query, (id_equipe,))
-            
-            conn.commit()
-            st.success("Votação resetada com sucesso para a equipe.")
-            st.experimental_rerun()  # Força a atualização da página após resetar a votação
+            with db.get_cursor() as cursor:
+                # Atualizar status_votacao para 'aguardando'
+                update_query = '''
+                    UPDATE tbl_equipes 
+                    SET status_votacao = 'aguardando' 
+                    WHERE id_equipe = %s;
+                '''
+                cursor.execute(update_query, (int(id_equipe),))
+                
+                # Deletar registros na tbl_notas
+                delete_query = '''
+                    DELETE FROM tbl_notas 
+                    WHERE id_equipe = %s;
+                '''
+                cursor.execute(delete_query, (int(id_equipe),))
         except Exception as e:
             st.error(f"Erro ao resetar votação: {e}")
-            conn.rollback()
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
+            return False
+        st.toast("Votação resetada com sucesso para a equipe.")
+        return True
     
     # Função para adicionar jurado a uma equipe (inserir na tbl_notas)
     def adicionar_jurado(id_ano, id_modalidade, id_equipe, id_jurado):
         try:
-            conn = get_connection()
-            if not conn:
-                return
-            cursor = conn.cursor()
-            
-            # Verificar se já existe registro para o jurado e critérios
-            criterios = carregar_criterios(id_modalidade)
-            insert_query = '''
+            # Insere de uma vez uma cédula por critério, ignorando as que já existem
+            query = '''
                 INSERT INTO tbl_notas (status, nota, id_ano, id_modalidade, id_equipe, id_jurado, id_criterio)
-                VALUES (%s, %s, %s, %s, %s, %s, %s);
+                SELECT 'liberado', NULL, %(ano)s, %(modalidade)s, %(equipe)s, %(jurado)s, c.id_criterio
+                FROM tbl_criterios c
+                WHERE c.id_modalidade = %(modalidade)s
+                  AND NOT EXISTS (
+                      SELECT 1 FROM tbl_notas n
+                      WHERE n.id_equipe = %(equipe)s
+                        AND n.id_jurado = %(jurado)s
+                        AND n.id_criterio = c.id_criterio
+                  );
             '''
-            for criterio in criterios:
-                id_criterio, nome_criterio = criterio
-                # Evitar duplicatas
-                check_query = '''
-                    SELECT COUNT(*) 
-                    FROM tbl_notas 
-                    WHERE id_equipe = %s AND id_jurado = %s AND id_criterio = %s;
-                '''
-                cursor.execute(check_query, (id_equipe, id_jurado, id_criterio))
-                count = cursor.fetchone()[0]
-                if count == 0:
-                    cursor.execute(insert_query, ('liberado', None, id_ano, id_modalidade, id_equipe, id_jurado, id_criterio))
-            
-            conn.commit()
-            st.success("Jurado adicionado com sucesso à equipe.")
-            st.experimental_rerun()  # Força a atualização da página após adicionar um jurado
+            db.executar(query, {"ano": int(id_ano), "modalidade": int(id_modalidade),
+                                "equipe": int(id_equipe), "jurado": int(id_jurado)})
         except Exception as e:
             st.error(f"Erro ao adicionar jurado: {e}")
-            conn.rollback()
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
+            return False
+        st.toast("Jurado adicionado com sucesso à equipe.")
+        return True
     
     # Função para bloquear ou liberar jurado
     def alternar_status_jurado(id_equipe, id_jurado, status_atual):
@@ -299,19 +276,14 @@ def show():
             # Converter para int se necessário
             if isinstance(id_equipe, (pd._libs.tslibs.nattype.NaTType,)):
                 st.error("id_equipe inválido.")
-                return
+                return False
             if isinstance(id_jurado, (pd._libs.tslibs.nattype.NaTType,)):
                 st.error("id_jurado inválido.")
-                return
+                return False
             
             id_equipe = int(id_equipe)
             id_jurado = int(id_jurado)
             
-            conn = get_connection()
-            if not conn:
-                return
-            cursor = conn.cursor()
-            
             if status_atual.lower() == 'liberado':
                 # Bloquear: atualizar status para 'bloqueado' e limpar 'nota'
                 update_query = '''
@@ -319,9 +291,8 @@ def show():
                     SET status = 'bloqueado', nota = NULL 
                     WHERE id_equipe = %s AND id_jurado = %s;
                 '''
-                cursor.execute(update_query, (id_equipe, id_jurado))
-                conn.commit()
-                st.success("Juror bloqueado com sucesso.")
+                db.executar(update_query, (id_equipe, id_jurado))
+                st.toast("Juror bloqueado com sucesso.")
             elif status_atual.lower() == 'bloqueado':
                 # Liberar: atualizar status para 'liberado' (mantendo 'nota' como NULL)
                 update_query = '''
@@ -329,25 +300,218 @@ def show():
                     SET status = 'liberado' 
                     WHERE id_equipe = %s AND id_jurado = %s;
                 '''
-                cursor.execute(update_query, (id_equipe, id_jurado))
-                conn.commit()
-                st.success("Juror liberado com sucesso.")
+                db.executar(update_query, (id_equipe, id_jurado))
+                st.toast("Juror liberado com sucesso.")
             else:
                 st.warning("Status desconhecido.")
-            
-            st.experimental_rerun()  # Força a atualização da página após a alteração
+                return False
         except Exception as e:
             st.error(f"Erro ao alternar status do jurado: {e}")
-            conn.rollback()
-        finally:
-            if 'cursor' in locals():
-                cursor.close()
-            if conn:
-                conn.close()
+            return False
+        return True
+    
+    # Carrega os detalhes (participantes e notas) das equipes informadas com um número
+    # fixo de consultas, qualquer que seja o número de equipes
+    def carregar_detalhes(ids_equipes):
+        ids_equipes = [int(i) for i in ids_equipes]
+        if not ids_equipes:
+            return {}
+        
+        # Versões lidas antes das consultas: um aviso que chegue durante a carga
+        # deixa o painel desatualizado e ele é recarregado na próxima conferência
+        versoes = {id_equipe: notificacoes.versao_equipe(id_equipe) for id_equipe in ids_equipes}
+        
+        participantes_por_equipe = carregar_participantes(ids_equipes)
+        
+        # Cada equipe na sua página de jurados, todas na mesma consulta
+        cursores = {id_equipe: paginacao.cursor_atual(f"notas_{id_equipe}") for id_equipe in ids_equipes}
+        notas_df = carregar_notas(cursores)
+        notas_por_equipe = {}
+        if not notas_df.empty:
+            notas_por_equipe = {int(eid): grupo for eid, grupo in notas_df.groupby('id_equipe')}
+        
+        agora = time.monotonic()
+        return {
+            id_equipe: {
+                'participantes': participantes_por_equipe.get(id_equipe, []),
+                'notas': notas_por_equipe.get(id_equipe, pd.DataFrame()),
+                'cursor_notas': cursores[id_equipe],
+                'versao_notas': versoes[id_equipe],
+                'carregado_em': agora,
+            }
+            for id_equipe in ids_equipes
+        }
+    
+    # Guarda detalhes no cache da sessão, descartando os painéis abertos há mais tempo
+    def guardar_detalhes(detalhes):
+        paineis = st.session_state['paineis_votacao']
+        for id_equipe, detalhe in detalhes.items():
+            paineis[id_equipe] = detalhe
+            paineis.move_to_end(id_equipe)
+        # Nunca descarta o lote que acabou de ser carregado
+        limite = max(MAX_PAINEIS_EM_CACHE, len(detalhes))
+        while len(paineis) > limite:
+            paineis.popitem(last=False)
+    
+    # Detalhes em cache ainda valem? Com o ouvinte de avisos conectado, valem até chegar um
+    # aviso para a equipe (no máximo IDADE_MAXIMA_PAINEL_SEGUNDOS); sem ele, por VALIDADE_PAINEL_SEGUNDOS
+    def detalhe_atual(id_equipe, detalhe):
+        if detalhe['versao_notas'] != notificacoes.versao_equipe(id_equipe):
+            return False
+        validade = IDADE_MAXIMA_PAINEL_SEGUNDOS if notificacoes.ativo() else VALIDADE_PAINEL_SEGUNDOS
+        return time.monotonic() - detalhe['carregado_em'] <= validade
+    
+    # Detalhes de uma equipe, do cache da sessão se ainda forem atuais
+    # e da mesma página de jurados que está sendo exibida
+    def obter_detalhes(id_equipe):
+        paineis = st.session_state['paineis_votacao']
+        detalhe = paineis.get(id_equipe)
+        if (
+            detalhe is None
+            or not detalhe_atual(id_equipe, detalhe)
+            or detalhe['cursor_notas'] != paginacao.cursor_atual(f"notas_{id_equipe}")
+        ):
+            guardar_detalhes(carregar_detalhes([id_equipe]))
+        else:
+            paineis.move_to_end(id_equipe)
+        return paineis[id_equipe]
+    
+    # Equipes cujos detalhes devem ser exibidos nesta execução
+    def detalhes_visiveis(id_equipe):
+        return not sob_demanda or st.session_state.get(f"detalhes_{id_equipe}", False)
+    
+    # Recarrega apenas o painel de uma equipe após uma ação nela
+    def recarregar_painel(id_equipe):
+        equipe_df = carregar_equipes_por_id([id_equipe])
+        for equipe in equipe_df.to_dict('records'):
+            st.session_state['equipes_votacao'][id_equipe] = equipe
+        guardar_detalhes(carregar_detalhes([id_equipe]))
+        # Mantém o expander aberto mesmo que o título (status) mude
+        st.session_state['equipe_aberta'] = id_equipe
+    
+    # Cada jurado é um fragmento: Bloquear/Liberar reexecuta só a linha dele
+    @st.fragment
+    @instrumentacao.perfilar(PAGINA)
+    def linha_jurado(id_equipe, id_jurado):
+        notas_df = obter_detalhes(id_equipe)['notas']
+        # A equipe pode ter ficado sem notas desde a última execução (votação resetada
+        # em outra sessão): o DataFrame vazio nem tem as colunas
+        if notas_df.empty:
+            return
+        notas_jurado = notas_df[notas_df['id_jurado'] == id_jurado]
+        jurados = notas_jurado.groupby(['id_jurado', 'jurado', 'status', 'especialista'])
+        
+        for (_, jurado_nome, status_nota, especialista), group in jurados:
+            st.write(f"**Juror:** {jurado_nome} | **Status:** {status_nota} | **Especialista:** {especialista}")
+            
+            # Botão Bloquear/Liberar
+            botao_label = "Bloquear" if status_nota.lower() == 'liberado' else "Liberar"
+            botao_key = f"botao_bloquear_{id_equipe}_{id_jurado}"
+            
+            if st.button(botao_label, key=botao_key):
+                if alternar_status_jurado(id_equipe, id_jurado, status_nota):
+                    recarregar_painel(id_equipe)
+                    st.rerun(scope="fragment")
+            
+            # Checkbox para mostrar/ocultar critérios
+            mostrar_criterios = st.checkbox("Mostrar Critérios", key=f"mostrar_{id_equipe}_{id_jurado}")
+            
+            if mostrar_criterios:
+                st.table(group[['criterio', 'nota']].rename(columns={'criterio': 'Critério', 'nota': 'Nota'}))
+    
+    # Cada equipe é um fragmento: os botões do painel reexecutam só este painel
+    def conteudo_painel(id_equipe):
+        equipe = st.session_state['equipes_votacao'].get(id_equipe)
+        if equipe is None:
+            return
+        nome_equipe = equipe['nome']
+        ordem_apresentacao = equipe['ordem_apresentacao']
+        status_votacao = equipe['status_votacao'] or ''
+        aberto = st.session_state.get('equipe_aberta') == id_equipe
+        
+        with st.expander(f"Equipe: {nome_equipe} | Ordem: {ordem_apresentacao} | Status: {status_votacao}", expanded=aberto):
+            col1, col2 = st.columns([1,1])
+            
+            with col1:
+                # Botões para Iniciar e Resetar Votação
+                iniciar_key = f"iniciar_{id_equipe}"
+                resetar_key = f"resetar_{id_equipe}"
+                
+                if status_votacao.lower() != 'votando':
+                    if st.button("Iniciar Votação", key=iniciar_key):
+                        if iniciar_votacao(ano_selecionado, id_modalidade_selecionada, [id_equipe]):
+                            recarregar_painel(id_equipe)
+                            st.rerun(scope="fragment")
+                else:
+                    if st.button("Resetar Votação", key=resetar_key):
+                        if resetar_votacao(id_equipe):
+                            recarregar_painel(id_equipe)
+                            st.rerun(scope="fragment")
+            
+            # No modo sob demanda, nada abaixo é consultado até o operador pedir
+            if sob_demanda:
+                with col2:
+                    st.toggle("Mostrar detalhes", key=f"detalhes_{id_equipe}")
+                if not detalhes_visiveis(id_equipe):
+                    return
+            
+            detalhe = obter_detalhes(id_equipe)
+            
+            with col2:
+                # Botão para Adicionar Jurado
+                if status_votacao.lower() == 'votando':
+                    jurados_disponiveis = carregar_jurados(ano_selecionado)
+                    if not jurados_disponiveis:
+                        st.warning("Não há jurados cadastrados para este ano.")
+                    else:
+                        jurado_dict = {nome: jid for (jid, nome) in jurados_disponiveis}
+                        jurado_nomes = list(jurado_dict.keys())
+                        
+                        # Seleção de jurado a ser adicionado
+                        jurado_selecionado = st.selectbox(f"Adicionar Jurado para {nome_equipe}:", jurado_nomes, key=f"jurado_{id_equipe}")
+                        id_jurado_selecionado = jurado_dict[jurado_selecionado]
+                        
+                        if st.button("Adicionar Jurado", key=f"add_jurado_{id_equipe}"):
+                            if adicionar_jurado(ano_selecionado, id_modalidade_selecionada, id_equipe, id_jurado_selecionado):
+                                recarregar_painel(id_equipe)
+                                st.rerun(scope="fragment")
+            
+            st.markdown("### Participantes")
+            participantes = detalhe['participantes']
+            if not participantes:
+                st.write("Nenhum participante cadastrado para esta equipe.")
+            else:
+                for nome_participante, turma_participante in participantes:
+                    st.write(f"- {nome_participante} ({turma_participante})")
+            
+            if status_votacao.lower() == 'votando':
+                st.markdown("### Notas")
+                notas_df = detalhe['notas']
+                
+                chave_notas = f"notas_{id_equipe}"
+                if notas_df.empty and paginacao.numero_pagina(chave_notas) == 1:
+                    st.write("Nenhuma nota cadastrada.")
+                else:
+                    jurados_df = pd.DataFrame(columns=['jurado', 'id_jurado'])
+                    if not notas_df.empty:
+                        jurados_df = notas_df[['jurado', 'id_jurado']].drop_duplicates()
+                    jurados_df, tem_proxima = paginacao.recortar(jurados_df, JURADOS_POR_PAGINA)
+                    for id_jurado in jurados_df['id_jurado']:
+                        linha_jurado(id_equipe, int(id_jurado))
+                    paginacao.navegacao(chave_notas, jurados_df, ['jurado', 'id_jurado'], tem_proxima, escopo="fragment")
+    
+    # As reexecuções dos painéis também entram no perfil de consultas (paginas/instrumentacao.py)
+    conteudo_painel = instrumentacao.perfilar(PAGINA)(conteudo_painel)
+    painel_equipe = st.fragment(conteudo_painel)
+    # Painel em votação com as notas ao vivo: o fragmento se reexecuta sozinho e só
+    # consulta o banco quando chegou aviso de alteração para a equipe
+    painel_ao_vivo = st.fragment(conteudo_painel, run_every=INTERVALO_AO_VIVO_SEGUNDOS)
     
     # Inicializa estados de sessão para ações
     if 'action' not in st.session_state:
         st.session_state['action'] = {}
+    if 'paineis_votacao' not in st.session_state:
+        st.session_state['paineis_votacao'] = OrderedDict()
     
     # Carregar anos disponíveis
     anos_disponiveis = carregar_anos()
@@ -369,7 +533,7 @@ def show():
         # Criar dicionário de modalidade para fácil acesso
         modalidade_dict = {nome: mid for (mid, nome) in modalidades}
         modalidade_nomes = list(modalidade_dict.keys())
-    
+        
         # Combobox para selecionar modalidade
         modalidade_selecionada_nome = st.selectbox("Selecione a Modalidade:", modalidade_nomes)
         id_modalidade_selecionada = modalidade_dict[modalidade_selecionada_nome]
@@ -380,6 +544,14 @@ def show():
     # Combobox para selecionar grau
     grau_selecionado = st.selectbox("Selecione o Grau:", graus_disponiveis)
     
+    # Sob demanda, participantes e notas de uma equipe só são buscados quando o operador abre os detalhes
+    sob_demanda = st.toggle("Carregar detalhes das equipes sob demanda", value=True, key="votacao_sob_demanda")
+    
+    # Os painéis abertos das equipes em votação acompanham as notas sem o operador clicar em nada
+    ao_vivo = st.toggle("Atualizar notas ao vivo", value=True, key="votacao_ao_vivo")
+    if ao_vivo and not notificacoes.ativo():
+        st.caption(f"Sem conexão para avisos de notas: os painéis são atualizados a cada {VALIDADE_PAINEL_SEGUNDOS} segundos.")
+    
     st.markdown("---")
     
     # Carregar equipes com base nos filtros (corrigido)
@@ -388,112 +560,43 @@ def show():
     if equipes_df.empty:
         st.info("Não há equipes cadastradas para os filtros selecionados.")
     else:
-        for index, equipe in equipes_df.iterrows():
-            id_equipe = equipe['id_equipe']
-            nome_equipe = equipe['nome']
-            ordem_apresentacao = equipe['ordem_apresentacao']
-            status_votacao = equipe['status_votacao']
-            
-            with st.expander(f"Equipe: {nome_equipe} | Ordem: {ordem_apresentacao} | Status: {status_votacao}", expanded=False):
-                col1, col2 = st.columns([1,1])
-                
-                with col1:
-                    # Botões para Iniciar e Resetar Votação
-                    iniciar_key = f"iniciar_{id_equipe}"
-                    resetar_key = f"resetar_{id_equipe}"
-                    
-                    if status_votacao.lower() != 'votando':
-                        if st.button("Iniciar Votação", key=iniciar_key):
-                            iniciar_votacao(ano_selecionado, id_modalidade_selecionada, id_equipe)
-                    else:
-                        if st.button("Resetar Votação", key=resetar_key):
-                            resetar_votacao(id_equipe)
-                
-                with col2:
-                    # Botão para Adicionar Jurado
-                    if status_votacao.lower() == 'votando':
-                        jurados_disponiveis = carregar_jurados(ano_selecionado)
-                        if not jurados_disponiveis:
-                            st.warning("Não há jurados cadastrados para este ano.")
-                        else:
-                            jurado_dict = {nome: jid for (jid, nome) in jurados_disponiveis}
-                            jurado_nomes = list(jurado_dict.keys())
-                            
-                            # Seleção de jurado a ser adicionado
-                            jurado_selecionado = st.selectbox(f"Adicionar Jurado para {nome_equipe}:", jurado_nomes, key=f"jurado_{id_equipe}")
-                            id_jurado_selecionado = jurado_dict[jurado_selecionado]
-                            
-                            if st.button("Adicionar Jurado", key=f"add_jurado_{id_equipe}"):
-                                adicionar_jurado(ano_selecionado, id_modalidade_selecionada, id_equipe, id_jurado_selecionado)
-    
-                st.markdown("### Participantes")
-                participantes_df = carregar_participantes(id_equipe)
-                if participantes_df.empty:
-                    st.write("Nenhum participante cadastrado para esta equipe.")
-                else:
-                    for idx, participante in participantes_df.iterrows():
-                        st.write(f"- {participante['nome']} ({participante['turma']})")
-                
-                if status_votacao.lower() == 'votando':
-                    st.markdown("### Notas")
-                    try:
-                        conn = get_connection()
-                        if conn:
-                            cursor = conn.cursor()
-                            query = '''
-                                SELECT 
-                                    j.id_jurado,
-                                    j.nome AS jurado, 
-                                    n.status, 
-                                    c.nome AS criterio, 
-                                    CASE 
-                                        WHEN e.id_jurado IS NOT NULL THEN 'Sim' 
-                                        ELSE 'Não' 
-                                    END AS especialista, 
-                                    n.nota
-                                FROM tbl_notas n
-                                JOIN tbl_jurados j ON n.id_jurado = j.id_jurado
-                                JOIN tbl_criterios c ON n.id_criterio = c.id_criterio
-                                LEFT JOIN tbl_especialistas e 
-                                    ON j.id_jurado = e.id_jurado 
-                                    AND c.id_modalidade = e.id_modalidade 
-                                    AND e.id_ano = n.id_ano
-                                WHERE n.id_equipe = %s
-                                ORDER BY j.nome, c.nome;
-                            '''
-                            cursor.execute(query, (id_equipe,))
-                            rows = cursor.fetchall()
-                            colunas = [desc[0] for desc in cursor.description]
-                            notas_df = pd.DataFrame(rows, columns=colunas)
-                            
-                            if notas_df.empty:
-                                st.write("Nenhuma nota cadastrada.")
-                            else:
-                                # Agrupar notas por jurado
-                                jurados = notas_df.groupby(['id_jurado', 'jurado', 'status', 'especialista'])
-                                
-                                for (id_jurado, jurado_nome, status_nota, especialista), group in jurados:
-                                    st.write(f"**Juror:** {jurado_nome} | **Status:** {status_nota} | **Especialista:** {especialista}")
-                                    
-                                    # Botão Bloquear/Liberar
-                                    botao_label = "Bloquear" if status_nota.lower() == 'liberado' else "Liberar"
-                                    botao_key = f"botao_bloquear_{id_equipe}_{id_jurado}"
-                                    
-                                    if st.button(botao_label, key=botao_key):
-                                        alternar_status_jurado(id_equipe, id_jurado, status_nota)
-                                    
-                                    # Checkbox para mostrar/ocultar critérios
-                                    mostrar_criterios = st.checkbox("Mostrar Critérios", key=f"mostrar_{id_equipe}_{id_jurado}")
-                                    
-                                    if mostrar_criterios:
-                                        st.table(group[['criterio', 'nota']].rename(columns={'criterio': 'Critério', 'nota': 'Nota'}))
-                    except Exception as e:
-                        st.error(f"Erro ao carregar notas: {e}")
-                    finally:
-                        if 'cursor' in locals():
-                            cursor.close()
-                        if conn:
-                            conn.close()
+        # Iniciar a votação de todas as equipes do grau que ainda não estão votando
+        pendentes = equipes_df[equipes_df['status_votacao'].fillna('').str.lower() != 'votando']
+        if not pendentes.empty:
+            if st.button(f"Iniciar Votação de Todas as Equipes ({len(pendentes)})", key="iniciar_todas"):
+                if iniciar_votacao(ano_selecionado, id_modalidade_selecionada, pendentes['id_equipe'].tolist()):
+                    st.session_state['paineis_votacao'].clear()
+                    st.rerun()  # Todas as equipes mudam: atualiza a página inteira
+        
+        st.session_state['equipes_votacao'] = {int(e['id_equipe']): e for e in equipes_df.to_dict('records')}
+        
+        # Detalhes das equipes visíveis que não estão no cache (ou expiraram), buscados de uma vez
+        paineis = st.session_state['paineis_votacao']
+        pendentes_carga = [
+            id_equipe for id_equipe in st.session_state['equipes_votacao']
+            if detalhes_visiveis(id_equipe)
+            and (id_equipe not in paineis or not detalhe_atual(id_equipe, paineis[id_equipe]))
+        ]
+        guardar_detalhes(carregar_detalhes(pendentes_carga))
+        
+        # Painéis ao vivo: equipes em votação com os detalhes na tela, no máximo MAX_PAINEIS_AO_VIVO
+        # (o painel em que o operador agiu por último vem primeiro). Cada um se reexecuta sozinho
+        # e só consulta o banco quando a sua equipe mudou; o resto da página não é reexecutado.
+        ao_vivo_ids = [
+            id_equipe for id_equipe, equipe in st.session_state['equipes_votacao'].items()
+            if (equipe['status_votacao'] or '').lower() == 'votando' and detalhes_visiveis(id_equipe)
+        ] if ao_vivo else []
+        ao_vivo_ids.sort(key=lambda id_equipe: id_equipe != st.session_state.get('equipe_aberta'))
+        if len(ao_vivo_ids) > MAX_PAINEIS_AO_VIVO:
+            st.caption(f"Só {MAX_PAINEIS_AO_VIVO} das {len(ao_vivo_ids)} equipes em votação são atualizadas ao vivo; "
+                       "as demais, ao interagir com a página.")
+        ao_vivo_ids = set(ao_vivo_ids[:MAX_PAINEIS_AO_VIVO])
+        
+        for id_equipe in st.session_state['equipes_votacao']:
+            if id_equipe in ao_vivo_ids:
+                painel_ao_vivo(id_equipe)
+            else:
+                painel_equipe(id_equipe)
 
 # Para rodar esta página como uma aplicação Streamlit, salve este código em um arquivo chamado `controle_votacoes.py` e execute:
 # streamlit run controle_votacoes.py
@@ -0,0 +1,164 @@
+# paginas/db.py
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import psycopg2
+import psycopg2.extensions
+import streamlit as st
+from psycopg2 import pool
+from paginas import config, instrumentacao  # noqa: F401
+
+# Variáveis de ambiente já carregadas do .env por paginas/config.py
+DB_URL = os.getenv("DB_URL")
+
+# Configurações do pool (podem ser sobrescritas no .env)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))            # segundos esperando conexão livre
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))         # segundos para abrir uma conexão
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "30000"))  # milissegundos por comando
+
+
+# Contadores do processo: comandos enviados ao banco e conexões emprestadas do pool.
+# Usados pelos benchmarks (benchmarks/) para medir quantas consultas cada página faz.
+_contadores_lock = threading.Lock()
+_contadores = {"consultas": 0, "emprestimos": 0}
+
+
+def _contar(nome):
+    with _contadores_lock:
+        _contadores[nome] += 1
+
+
+def contadores():
+    with _contadores_lock:
+        return dict(_contadores)
+
+
+class CursorContado(psycopg2.extensions.cursor):
+    # Cursor que conta e cronometra cada comando executado (execute_values e cursores
+    # nomeados incluídos); o tempo vai para o perfil da execução (paginas/instrumentacao.py)
+
+    def execute(self, query, vars=None):
+        _contar("consultas")
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            instrumentacao.registrar_consulta(query, time.perf_counter() - inicio, self.rowcount)
+
+    def executemany(self, query, vars_list):
+        _contar("consultas")
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            instrumentacao.registrar_consulta(query, time.perf_counter() - inicio, self.rowcount)
+
+    def copy_expert(self, sql, file, size=8192):
+        _contar("consultas")
+        inicio = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            instrumentacao.registrar_consulta(sql, time.perf_counter() - inicio, self.rowcount)
+
+
+class PoolConexoes(pool.ThreadedConnectionPool):
+    # O ThreadedConnectionPool do psycopg2 falha na hora quando todas as conexões
+    # estão emprestadas; aqui a sessão espera até DB_POOL_TIMEOUT por uma vaga.
+
+    def __init__(self, minconn, maxconn, timeout, *args, **kwargs):
+        self._vagas = threading.BoundedSemaphore(maxconn)
+        self._timeout = timeout
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def getconn(self, key=None):
+        if not self._vagas.acquire(timeout=self._timeout):
+            raise pool.PoolError("Tempo esgotado aguardando uma conexão livre com o banco de dados.")
+        try:
+            conn = super().getconn(key)
+        except Exception:
+            self._vagas.release()
+            raise
+        _contar("emprestimos")
+        return conn
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self._vagas.release()
+
+    # Conexões abertas com o banco (livres + emprestadas)
+    def conexoes_abertas(self):
+        return len(self._pool) + len(self._used)
+
+
+# Pool único por processo, compartilhado entre todas as sessões do Streamlit
+@st.cache_resource(show_spinner=False)
+def get_pool():
+    return PoolConexoes(
+        DB_POOL_MIN,
+        DB_POOL_MAX,
+        DB_POOL_TIMEOUT,
+        DB_URL,
+        connect_timeout=DB_CONNECT_TIMEOUT,
+        cursor_factory=CursorContado,
+        options=f"-c statement_timeout={DB_STATEMENT_TIMEOUT}",
+        keepalives=1,
+        keepalives_idle=30,
+    )
+
+
+@contextmanager
+def get_connection():
+    """Empresta uma conexão do pool: commit ao sair do bloco, rollback se houver erro."""
+    pool_conexoes = get_pool()
+    inicio = time.perf_counter()
+    conn = pool_conexoes.getconn()
+    instrumentacao.registrar_espera_conexao(time.perf_counter() - inicio)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        # Também cobre st.rerun()/st.stop(), que não devem confirmar nada pela metade
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            pass
+        raise
+    finally:
+        pool_conexoes.putconn(conn, close=bool(conn.closed))
+
+
+@contextmanager
+def get_cursor():
+    """Cursor dentro de uma transação: tudo o que for executado no bloco é confirmado junto."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            yield cursor
+
+
+# Atalhos para os casos de um único comando
+def consultar(query, params=None):
+    with get_cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
+def consultar_df(query, params=None):
+    with get_cursor() as cursor:
+        cursor.execute(query, params)
+        colunas = [desc[0] for desc in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=colunas)
+
+
+def executar(query, params=None):
+    with get_cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.rowcount
@@ -0,0 +1,230 @@
+# paginas/exportacao.py
+#
+# Exportação dos dados de um ano (notas, classificação e participantes) para
+# CSV ou Parquet. As linhas vêm de um cursor nomeado (do lado do servidor) em
+# lotes de TAMANHO_LOTE e são gravadas em um arquivo temporário à medida que
+# chegam: o ano inteiro nunca fica em um DataFrame.
+#
+# Os arquivos ficam em EXPORTACAO_DIR. Sessões que fecham sem gerar outro arquivo
+# não apagam o seu: cada nova exportação remove os que passaram de
+# VALIDADE_EXPORTACAO_SEGUNDOS.
+
+import csv
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+from paginas import db, nota_final
+
+TAMANHO_LOTE = 2000
+EXPORTACAO_DIR = Path(tempfile.gettempdir()) / "festival_exportacao"
+VALIDADE_EXPORTACAO_SEGUNDOS = 60 * 60
+
+# Conjuntos exportáveis: consulta (parâmetro %(ano)s) e esquema Arrow das colunas, na mesma ordem
+CONJUNTOS = {
+    "notas": {
+        "rotulo": "Notas",
+        "query": """
+            SELECT
+                m.nome AS modalidade,
+                eq.grau,
+                eq.nome AS equipe,
+                j.nome AS jurado,
+                EXISTS (
+                    SELECT 1 FROM tbl_especialistas es
+                    WHERE es.id_jurado = n.id_jurado
+                      AND es.id_ano = n.id_ano
+                      AND es.id_modalidade = n.id_modalidade
+                ) AS especialista,
+                c.nome AS criterio,
+                n.nota::float8 AS nota,
+                n.status
+            FROM tbl_notas n
+            JOIN tbl_modalidades m ON m.id_modalidade = n.id_modalidade
+            JOIN tbl_equipes eq ON eq.id_equipe = n.id_equipe
+            JOIN tbl_jurados j ON j.id_jurado = n.id_jurado
+            JOIN tbl_criterios c ON c.id_criterio = n.id_criterio
+            WHERE n.id_ano = %(ano)s
+            ORDER BY m.nome, eq.grau, eq.nome, j.nome, c.nome;
+        """,
+        "esquema": pa.schema([
+            ("modalidade", pa.string()),
+            ("grau", pa.string()),
+            ("equipe", pa.string()),
+            ("jurado", pa.string()),
+            ("especialista", pa.bool_()),
+            ("criterio", pa.string()),
+            ("nota", pa.float64()),
+            ("status", pa.string()),
+        ]),
+    },
+    # Nota final de todas as modalidades do ano (fórmula em paginas/nota_final.py)
+    "classificacao": {
+        "rotulo": "Classificação",
+        "query": f"""
+            WITH {nota_final.cte_notas_equipes("n.id_ano = %(ano)s")},
+            finais AS (
+                SELECT
+                    m.nome AS modalidade,
+                    eq.grau,
+                    eq.nome AS equipe,
+                    ({nota_final.EXPRESSAO_NOTA_FINAL})::float8 AS nota_final
+                FROM tbl_equipes eq
+                JOIN tbl_modalidades m ON m.id_modalidade = eq.id_modalidade
+                LEFT JOIN notas_equipes ne ON ne.id_equipe = eq.id_equipe
+                WHERE m.id_ano = %(ano)s
+            )
+            SELECT
+                modalidade,
+                grau,
+                RANK() OVER (PARTITION BY modalidade, grau ORDER BY nota_final DESC)::int AS posicao,
+                equipe,
+                nota_final
+            FROM finais
+            ORDER BY modalidade, grau, posicao, equipe;
+        """,
+        "esquema": pa.schema([
+            ("modalidade", pa.string()),
+            ("grau", pa.string()),
+            ("posicao", pa.int32()),
+            ("equipe", pa.string()),
+            ("nota_final", pa.float64()),
+        ]),
+    },
+    "participantes": {
+        "rotulo": "Participantes",
+        "query": """
+            SELECT
+                m.nome AS modalidade,
+                eq.grau,
+                eq.nome AS equipe,
+                eq.ordem_apresentacao,
+                p.nome AS participante,
+                p.turma
+            FROM tbl_participantes p
+            JOIN tbl_equipes eq ON eq.id_equipe = p.id_equipe
+            JOIN tbl_modalidades m ON m.id_modalidade = eq.id_modalidade
+            WHERE m.id_ano = %(ano)s
+            ORDER BY m.nome, eq.ordem_apresentacao, eq.nome, p.nome;
+        """,
+        "esquema": pa.schema([
+            ("modalidade", pa.string()),
+            ("grau", pa.string()),
+            ("equipe", pa.string()),
+            ("ordem_apresentacao", pa.int32()),
+            ("participante", pa.string()),
+            ("turma", pa.string()),
+        ]),
+    },
+}
+
+
+# Lotes de linhas da consulta, lidos de um cursor nomeado
+def ler_em_lotes(query, params):
+    with db.get_connection() as conn:
+        with conn.cursor(name="exportacao") as cursor:
+            cursor.itersize = TAMANHO_LOTE
+            cursor.execute(query, params)
+            while True:
+                lote = cursor.fetchmany(TAMANHO_LOTE)
+                if not lote:
+                    break
+                yield lote
+
+
+def gravar_csv(caminho, esquema, lotes):
+    total = 0
+    # utf-8-sig para o Excel reconhecer os acentos
+    with open(caminho, "w", newline="", encoding="utf-8-sig") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=";")
+        escritor.writerow(esquema.names)
+        for lote in lotes:
+            escritor.writerows(lote)
+            total += len(lote)
+    return total
+
+
+def gravar_parquet(caminho, esquema, lotes):
+    total = 0
+    with pq.ParquetWriter(caminho, esquema) as escritor:
+        for lote in lotes:
+            colunas = list(zip(*lote))
+            arrays = [pa.array(coluna, type=campo.type) for coluna, campo in zip(colunas, esquema)]
+            escritor.write_batch(pa.record_batch(arrays, schema=esquema))
+            total += len(lote)
+    return total
+
+
+# Remove os arquivos exportados há mais de VALIDADE_EXPORTACAO_SEGUNDOS
+def limpar_exportacoes_antigas():
+    limite = time.time() - VALIDADE_EXPORTACAO_SEGUNDOS
+    for arquivo in EXPORTACAO_DIR.glob("*"):
+        try:
+            if arquivo.stat().st_mtime < limite:
+                arquivo.unlink()
+        except OSError:
+            # Já removido por outra sessão
+            continue
+
+
+# Gera o arquivo do conjunto para o ano e devolve (caminho, quantidade de linhas)
+def exportar(conjunto, ano, formato):
+    definicao = CONJUNTOS[conjunto]
+    EXPORTACAO_DIR.mkdir(parents=True, exist_ok=True)
+    limpar_exportacoes_antigas()
+    descritor, caminho = tempfile.mkstemp(prefix=f"{conjunto}_{ano}_", suffix=f".{formato}", dir=EXPORTACAO_DIR)
+    os.close(descritor)
+    lotes = ler_em_lotes(definicao["query"], {"ano": int(ano)})
+    try:
+        if formato == "parquet":
+            total = gravar_parquet(caminho, definicao["esquema"], lotes)
+        else:
+            total = gravar_csv(caminho, definicao["esquema"], lotes)
+    except BaseException:
+        os.remove(caminho)
+        raise
+    finally:
+        # Devolve a conexão ao pool mesmo se a gravação parar no meio
+        lotes.close()
+    return caminho, total
+
+
+# Seção de exportação: gera o arquivo só quando pedido e oferece o download
+def secao_exportacao(ano):
+    with st.expander("Exportar dados do ano"):
+        col_conjunto, col_formato = st.columns(2)
+        conjunto = col_conjunto.selectbox(
+            "Dados:", list(CONJUNTOS), format_func=lambda c: CONJUNTOS[c]["rotulo"], key="exportacao_conjunto"
+        )
+        formato = col_formato.selectbox("Formato:", ["csv", "parquet"], key="exportacao_formato")
+
+        if st.button("Gerar arquivo", key="exportacao_gerar"):
+            anterior = st.session_state.pop("exportacao_arquivo", None)
+            if anterior and os.path.exists(anterior["caminho"]):
+                os.remove(anterior["caminho"])
+            try:
+                caminho, total = exportar(conjunto, ano, formato)
+            except Exception as e:
+                st.error(f"Erro ao exportar {CONJUNTOS[conjunto]['rotulo'].lower()}: {e}")
+                return
+            st.session_state["exportacao_arquivo"] = {
+                "caminho": caminho,
+                "nome": f"{conjunto}_{ano}.{formato}",
+                "total": total,
+            }
+
+        arquivo = st.session_state.get("exportacao_arquivo")
+        if arquivo and os.path.exists(arquivo["caminho"]):
+            st.caption(f"{arquivo['total']} linha(s) exportada(s).")
+            with open(arquivo["caminho"], "rb") as dados:
+                st.download_button(
+                    f"Baixar {arquivo['nome']}",
+                    data=dados,
+                    file_name=arquivo["nome"],
+                    mime="application/octet-stream",
+                    key="exportacao_baixar",
+                )
@@ -0,0 +1,228 @@
+# paginas/importacao.py
+#
+# Importação de equipes e participantes a partir de planilhas (CSV ou XLSX).
+# As linhas são validadas em memória contra as modalidades e equipes do ano
+# (uma consulta para cada) e carregadas com COPY em uma tabela temporária,
+# seguido de um único INSERT ... SELECT, tudo na mesma transação. Linhas
+# recusadas, na validação ou por conflito no banco, são listadas de uma vez.
+
+import io
+
+import pandas as pd
+import streamlit as st
+from paginas import catalogo, db
+
+GRAUS = ["Ensino Fundamental", "Ensino Médio"]
+
+COLUNAS_EQUIPES = ["modalidade", "nome", "ordem_apresentacao", "grau", "ficha_tecnica"]
+COLUNAS_PARTICIPANTES = ["modalidade", "equipe", "nome", "turma"]
+
+
+# Lê o arquivo enviado em um DataFrame de textos; o índice é o número da linha na planilha
+def ler_arquivo(arquivo):
+    if arquivo.name.lower().endswith(".xlsx"):
+        # O pandas lê .xlsx com o openpyxl (requirements.txt)
+        df = pd.read_excel(arquivo, dtype=str, engine="openpyxl")
+    else:
+        # sep=None detecta vírgula ou ponto e vírgula (padrão do Excel em português)
+        df = pd.read_csv(arquivo, dtype=str, sep=None, engine="python", encoding="utf-8-sig")
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    df = df.fillna("").apply(lambda coluna: coluna.str.strip())
+    df.index = df.index + 2  # a linha 1 é o cabeçalho
+    return df
+
+
+def verificar_colunas(df, obrigatorias):
+    faltando = [c for c in obrigatorias if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no arquivo: {', '.join(faltando)}.")
+
+
+# Copia as linhas para uma tabela temporária e insere na tabela final com um único comando.
+# insert_sql lê de "importacao" e devolve a coluna linha das linhas efetivamente inseridas.
+def copiar_e_inserir(cursor, definicao_colunas, df, insert_sql):
+    cursor.execute(f"CREATE TEMP TABLE importacao ({definicao_colunas}) ON COMMIT DROP;")
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=True, header=False)
+    buffer.seek(0)
+    cursor.copy_expert("COPY importacao FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.execute(insert_sql)
+    return {linha for (linha,) in cursor.fetchall()}
+
+
+def montar_rejeitados(df, erros):
+    if not erros:
+        return pd.DataFrame()
+    rejeitados = df.loc[list(erros)].copy()
+    rejeitados.insert(0, "motivo", [erros[linha] for linha in rejeitados.index])
+    rejeitados.index.name = "linha"
+    return rejeitados.reset_index()
+
+
+# Importa equipes para as modalidades do ano. Devolve (quantidade inserida, DataFrame dos recusados).
+def importar_equipes(df, ano):
+    verificar_colunas(df, ["modalidade", "nome", "ordem_apresentacao", "grau"])
+    if "ficha_tecnica" not in df.columns:
+        df["ficha_tecnica"] = ""
+
+    modalidades = {nome.lower(): mid for mid, nome in catalogo.carregar_modalidades(ano)}
+    graus = {g.lower(): g for g in GRAUS}
+    existentes = set(db.consultar(
+        '''
+        SELECT e.id_modalidade, LOWER(e.nome)
+        FROM tbl_equipes e
+        JOIN tbl_modalidades m ON m.id_modalidade = e.id_modalidade
+        WHERE m.id_ano = %s;
+        ''',
+        (int(ano),),
+    ))
+
+    erros = {}
+    validas = []
+    vistas = set()
+    for linha, row in df.iterrows():
+        id_modalidade = modalidades.get(row["modalidade"].lower())
+        chave = (id_modalidade, row["nome"].lower())
+        if id_modalidade is None:
+            erros[linha] = f"Modalidade '{row['modalidade']}' não existe no ano {ano}."
+        elif not row["nome"] or len(row["nome"]) > 150:
+            erros[linha] = "Nome da equipe em branco ou com mais de 150 caracteres."
+        elif not row["ordem_apresentacao"].isdigit() or int(row["ordem_apresentacao"]) <= 0:
+            erros[linha] = "Ordem de apresentação deve ser um número positivo."
+        elif row["grau"].lower() not in graus:
+            erros[linha] = f"Grau deve ser um de: {', '.join(GRAUS)}."
+        elif chave in existentes:
+            erros[linha] = "Equipe já cadastrada nesta modalidade."
+        elif chave in vistas:
+            erros[linha] = "Equipe repetida no arquivo."
+        else:
+            vistas.add(chave)
+            validas.append((linha, row["nome"], int(row["ordem_apresentacao"]), id_modalidade,
+                            graus[row["grau"].lower()], row["ficha_tecnica"] or None))
+
+    inseridas = set()
+    if validas:
+        carga = pd.DataFrame(validas, columns=["linha", "nome", "ordem_apresentacao", "id_modalidade", "grau", "ficha_tecnica"])
+        with db.get_cursor() as cursor:
+            inseridas = copiar_e_inserir(
+                cursor,
+                "linha INTEGER, nome TEXT, ordem_apresentacao INTEGER, id_modalidade INTEGER, grau TEXT, ficha_tecnica TEXT",
+                carga.set_index("linha"),
+                '''
+                WITH inseridos AS (
+                    INSERT INTO tbl_equipes (nome, ordem_apresentacao, id_modalidade, grau, ficha_tecnica)
+                    SELECT nome, ordem_apresentacao, id_modalidade, grau, ficha_tecnica
+                    FROM importacao
+                    ORDER BY linha
+                    ON CONFLICT DO NOTHING
+                    RETURNING id_modalidade, nome
+                )
+                SELECT i.linha
+                FROM importacao i
+                JOIN inseridos x ON x.id_modalidade = i.id_modalidade AND x.nome = i.nome;
+                ''',
+            )
+        for linha, *_ in validas:
+            if linha not in inseridas:
+                erros[linha] = "Conflito no banco: equipe já cadastrada."
+
+    return len(inseridas), montar_rejeitados(df, erros)
+
+
+# Importa participantes para as equipes do ano. Devolve (quantidade inserida, DataFrame dos recusados).
+def importar_participantes(df, ano):
+    verificar_colunas(df, COLUNAS_PARTICIPANTES)
+
+    modalidades = {nome.lower(): mid for mid, nome in catalogo.carregar_modalidades(ano)}
+    equipes = {
+        (id_modalidade, nome.lower()): id_equipe
+        for id_equipe, id_modalidade, nome in db.consultar(
+            '''
+            SELECT e.id_equipe, e.id_modalidade, e.nome
+            FROM tbl_equipes e
+            JOIN tbl_modalidades m ON m.id_modalidade = e.id_modalidade
+            WHERE m.id_ano = %s;
+            ''',
+            (int(ano),),
+        )
+    }
+
+    erros = {}
+    validas = []
+    vistas = set()
+    for linha, row in df.iterrows():
+        id_modalidade = modalidades.get(row["modalidade"].lower())
+        id_equipe = equipes.get((id_modalidade, row["equipe"].lower()))
+        chave = (id_equipe, row["nome"].lower())
+        if id_modalidade is None:
+            erros[linha] = f"Modalidade '{row['modalidade']}' não existe no ano {ano}."
+        elif id_equipe is None:
+            erros[linha] = f"Equipe '{row['equipe']}' não existe na modalidade '{row['modalidade']}'."
+        elif not row["nome"] or not row["turma"]:
+            erros[linha] = "Nome e turma do participante são obrigatórios."
+        elif len(row["nome"]) > 100 or len(row["turma"]) > 50:
+            erros[linha] = "Nome (até 100) ou turma (até 50 caracteres) muito longos."
+        elif chave in vistas:
+            erros[linha] = "Participante repetido na mesma equipe no arquivo."
+        else:
+            vistas.add(chave)
+            validas.append((linha, row["nome"], row["turma"], id_equipe))
+
+    inseridas = set()
+    if validas:
+        carga = pd.DataFrame(validas, columns=["linha", "nome", "turma", "id_equipe"])
+        with db.get_cursor() as cursor:
+            # Participante já existente na equipe (mesmo nome) é recusado como conflito
+            inseridas = copiar_e_inserir(
+                cursor,
+                "linha INTEGER, nome TEXT, turma TEXT, id_equipe INTEGER",
+                carga.set_index("linha"),
+                '''
+                WITH novos AS (
+                    SELECT i.*
+                    FROM importacao i
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM tbl_participantes p
+                        WHERE p.id_equipe = i.id_equipe AND LOWER(p.nome) = LOWER(i.nome)
+                    )
+                ),
+                inseridos AS (
+                    INSERT INTO tbl_participantes (nome, turma, id_equipe)
+                    SELECT nome, turma, id_equipe FROM novos ORDER BY linha
+                    ON CONFLICT DO NOTHING
+                    RETURNING id_equipe, nome
+                )
+                SELECT n.linha
+                FROM novos n
+                JOIN inseridos x ON x.id_equipe = n.id_equipe AND x.nome = n.nome;
+                ''',
+            )
+        for linha, *_ in validas:
+            if linha not in inseridas:
+                erros[linha] = "Participante já cadastrado nesta equipe."
+
+    return len(inseridas), montar_rejeitados(df, erros)
+
+
+# Seção de importação exibida nas páginas de cadastro
+def secao_importacao(chave, colunas, importar):
+    with st.expander("Importar planilha (CSV ou XLSX)"):
+        st.caption(f"Uma linha por registro, com o cabeçalho: {', '.join(colunas)}.")
+        arquivo = st.file_uploader("Arquivo:", type=["csv", "xlsx"], key=f"arquivo_{chave}")
+        if arquivo is None or not st.button("Importar", key=f"importar_{chave}"):
+            return
+
+        try:
+            inseridos, rejeitados = importar(ler_arquivo(arquivo))
+        except ValueError as e:
+            st.error(str(e))
+            return
+        except Exception as e:
+            st.error(f"Ocorreu um erro ao importar o arquivo: {e}")
+            return
+
+        st.success(f"{inseridos} registro(s) importado(s) com sucesso.")
+        if not rejeitados.empty:
+            st.warning(f"{len(rejeitados)} linha(s) não foram importadas:")
+            st.dataframe(rejeitados, hide_index=True, use_container_width=True)
@@ -0,0 +1,175 @@
+# paginas/instrumentacao.py
+#
+# Perfil de cada execução do app: todo comando enviado ao banco (pelo cursor de
+# paginas/db.py) é registrado com a consulta normalizada, a duração, as linhas
+# devolvidas e o tempo de espera pela conexão do pool. main.py abre o registro
+# no início da execução e o fecha no final; o resultado aparece no painel de
+# depuração da barra lateral e vai para um log rotativo (LOG_DIR/consultas.log).
+#
+# O registro é por thread: cada sessão do Streamlit executa o script na sua.
+# Reexecuções parciais de fragmentos não passam por main.py: o corpo dos
+# fragmentos é decorado com perfilar(), que abre e fecha o próprio registro
+# (só vai para o log, não para o painel, que é desenhado em execuções completas).
+# main.py importa este módulo em toda execução: o pandas só é importado quando o
+# painel é aberto, para não pesar na primeira renderização.
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import streamlit as st
+from paginas import config  # noqa: F401
+
+LOG_DIR = Path(os.getenv("LOG_DIR", Path(__file__).resolve().parent.parent / "logs"))
+LOG_ATIVO = os.getenv("LOG_CONSULTAS", "1") != "0"
+LOG_TAMANHO_MAXIMO = 5 * 1024 * 1024
+LOG_ARQUIVOS_ANTIGOS = 3
+
+_atual = threading.local()
+
+_logger = logging.getLogger("festival.consultas")
+_logger.propagate = False
+_logger_lock = threading.Lock()
+
+
+def _configurar_log():
+    with _logger_lock:
+        if _logger.handlers:
+            return
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            LOG_DIR / "consultas.log",
+            maxBytes=LOG_TAMANHO_MAXIMO,
+            backupCount=LOG_ARQUIVOS_ANTIGOS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+
+
+# Consulta sem os valores: literais viram ?, listas de VALUES e ARRAY[...] são resumidas.
+# Duas chamadas do mesmo carregar_* caem na mesma impressão digital.
+def impressao_digital(sql):
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", errors="replace")
+    sql = str(sql)
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"ARRAY\[[^\]]*\]", "ARRAY[?]", sql)
+    sql = re.sub(r"\s+", " ", sql).strip()
+    sql = re.sub(r"(\([?, ]*\))(?:\s*,\s*\([?, ]*\))+", r"\1, ...", sql)
+    return sql
+
+
+def iniciar():
+    _atual.registro = {"inicio": time.perf_counter(), "consultas": [], "espera_conexao": []}
+
+
+def registrar_consulta(sql, duracao, linhas):
+    registro = getattr(_atual, "registro", None)
+    if registro is not None:
+        registro["consultas"].append({
+            "consulta": impressao_digital(sql),
+            "duracao_ms": duracao * 1000,
+            "linhas": linhas if linhas is not None and linhas >= 0 else None,
+        })
+
+
+def registrar_espera_conexao(duracao):
+    registro = getattr(_atual, "registro", None)
+    if registro is not None:
+        registro["espera_conexao"].append(duracao * 1000)
+
+
+# Fecha o registro da execução, grava no log e o devolve (None se nenhum foi aberto)
+def finalizar(pagina):
+    registro = getattr(_atual, "registro", None)
+    _atual.registro = None
+    if registro is None:
+        return None
+    registro["pagina"] = pagina
+    registro["total_ms"] = (time.perf_counter() - registro.pop("inicio")) * 1000
+
+    if LOG_ATIVO:
+        try:
+            _configurar_log()
+            _logger.info(json.dumps({
+                "pagina": pagina,
+                "total_ms": round(registro["total_ms"], 1),
+                "espera_conexao_ms": round(sum(registro["espera_conexao"]), 1),
+                "consultas": [
+                    {**c, "duracao_ms": round(c["duracao_ms"], 2)} for c in registro["consultas"]
+                ],
+            }, ensure_ascii=False))
+        except OSError:
+            # Sem permissão de escrita no LOG_DIR: o painel continua funcionando
+            pass
+    return registro
+
+
+# Decorador do corpo de um fragmento: quando o fragmento se reexecuta sozinho, registra
+# as consultas dele com a página e o nome da função. Dentro de uma execução completa o
+# registro já está aberto e nada muda. Reexecuções sem consultas não vão para o log.
+def perfilar(pagina):
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            if getattr(_atual, "registro", None) is not None:
+                return funcao(*args, **kwargs)
+            iniciar()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                if _atual.registro["consultas"] or _atual.registro["espera_conexao"]:
+                    finalizar(f"{pagina} (fragmento {funcao.__name__})")
+                else:
+                    _atual.registro = None
+        return executar
+    return decorador
+
+
+# Consultas da execução agrupadas pela impressão digital, da mais cara para a mais barata
+def resumo(registro):
+    import pandas as pd
+
+    df = pd.DataFrame(registro["consultas"], columns=["consulta", "duracao_ms", "linhas"])
+    if df.empty:
+        return df
+    return (
+        df.groupby("consulta", as_index=False)
+        .agg(vezes=("duracao_ms", "size"), total_ms=("duracao_ms", "sum"),
+             max_ms=("duracao_ms", "max"), linhas=("linhas", "sum"))
+        .sort_values("total_ms", ascending=False)
+    )
+
+
+# Painel da barra lateral com o perfil da última execução
+def painel_depuracao(registro):
+    if registro is None:
+        return
+    consultas = registro["consultas"]
+    tempo_banco = sum(c["duracao_ms"] for c in consultas)
+    espera = registro["espera_conexao"]
+
+    st.markdown("### Depuração")
+    col1, col2 = st.columns(2)
+    col1.metric("Execução", f"{registro['total_ms']:.0f} ms")
+    col2.metric("Consultas", len(consultas))
+    col1.metric("Tempo no banco", f"{tempo_banco:.0f} ms")
+    col2.metric("Espera por conexão", f"{sum(espera):.0f} ms", help=f"{len(espera)} conexão(ões) emprestada(s)")
+
+    df = resumo(registro)
+    if not df.empty:
+        st.dataframe(
+            df.round({"total_ms": 1, "max_ms": 1}),
+            hide_index=True,
+            use_container_width=True,
+            column_config={"consulta": st.column_config.TextColumn("Consulta", width="large")},
+        )
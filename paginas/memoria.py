@@ -0,0 +1,189 @@
+# paginas/memoria.py
+#
+# Uso de memória do app, medido com o Pympler: tamanho do session_state de cada
+# chave da sessão atual, das sessões ativas do servidor e das entradas dos
+# caches de dados, com um histórico amostrado a cada INTERVALO_AMOSTRA_SEGUNDOS.
+#
+# Também poda as chaves temporárias de uma página (cursores de paginação, versões
+# das tabelas, painéis da votação) quando o operador troca de página: elas só
+# são recriadas ao voltar, e em sessões longas deixariam de crescer sem limite.
+# As chaves de widgets (mostrar_*, detalhes_*, ...) o próprio Streamlit descarta
+# quando o widget deixa de ser exibido.
+#
+# main.py chama podar_sessao() em toda execução e historico(), que na primeira vez
+# no processo inicia a thread de amostragem: as amostras (que percorrem o estado de
+# todas as sessões) ficam fora das execuções dos operadores. O Pympler só é
+# importado na primeira medida e o pandas quando a página é aberta: main.py importa
+# este módulo na primeira renderização.
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+
+INTERVALO_AMOSTRA_SEGUNDOS = 60
+MAX_AMOSTRAS = 24 * 60
+
+# Prefixos das chaves que só valem enquanto a página que as criou está aberta
+CHAVES_DA_PAGINA = ("keyset_", "versao_tabela_", "ids_tabela_", "paineis_votacao", "equipes_votacao", "equipe_aberta")
+
+
+def tamanho(objeto):
+    from pympler import asizeof
+
+    try:
+        return asizeof.asizeof(objeto)
+    except Exception:
+        # Objetos que o Pympler não consegue percorrer (extensões em C sem __sizeof__)
+        return 0
+
+
+def formatar_bytes(total):
+    for unidade in ["B", "KB", "MB"]:
+        if total < 1024:
+            return f"{total:.0f} {unidade}"
+        total /= 1024
+    return f"{total:.1f} GB"
+
+
+# Remove as chaves temporárias da página anterior quando a página muda. Devolve as chaves removidas.
+def podar_sessao(pagina):
+    anterior = st.session_state.get("pagina_menu")
+    st.session_state["pagina_menu"] = pagina
+    if anterior is None or anterior == pagina:
+        return []
+    return podar_chaves()
+
+
+def podar_chaves():
+    removidas = [k for k in list(st.session_state) if str(k).startswith(CHAVES_DA_PAGINA)]
+    for chave in removidas:
+        del st.session_state[chave]
+    return removidas
+
+
+# session_state (só as chaves visíveis ao app) de todas as sessões ativas do servidor.
+# Usa a API interna do runtime do Streamlit: se ela mudar, devolve só o que conseguir ler.
+def estados_das_sessoes():
+    try:
+        from streamlit.runtime import get_instance
+        infos = get_instance()._session_mgr.list_active_sessions()
+    except Exception:
+        return {}
+    estados = {}
+    for info in infos:
+        try:
+            estados[info.session.id] = dict(info.session.session_state.filtered_state)
+        except Exception:
+            continue
+    return estados
+
+
+# Entradas dos caches de dados (st.cache_data): [(função, bytes), ...]
+def entradas_caches():
+    try:
+        from streamlit.runtime.caching import get_data_cache_stats_provider
+        estatisticas = get_data_cache_stats_provider().get_stats()
+    except Exception:
+        return []
+    return [(e.cache_name, e.byte_length) for e in estatisticas]
+
+
+# Histórico do processo, compartilhado entre as sessões. Na primeira chamada inicia a
+# thread que registra uma amostra a cada INTERVALO_AMOSTRA_SEGUNDOS
+@st.cache_resource(show_spinner=False)
+def historico():
+    dados = {"lock": threading.Lock(), "amostras": deque(maxlen=MAX_AMOSTRAS)}
+    threading.Thread(target=_amostrar, args=(dados,), name="amostras_memoria", daemon=True).start()
+    return dados
+
+
+def _amostrar(dados):
+    while True:
+        time.sleep(INTERVALO_AMOSTRA_SEGUNDOS)
+        try:
+            registrar_amostra(dados)
+        except Exception:
+            # O estado das sessões pode mudar durante a leitura: fica para a próxima amostra
+            continue
+
+
+def registrar_amostra(dados):
+    estados = estados_das_sessoes()
+    amostra = {
+        "hora": datetime.now(),
+        "sessoes": len(estados),
+        "session_state": sum(tamanho(estado) for estado in estados.values()),
+        "caches": sum(tamanho_entrada for _, tamanho_entrada in entradas_caches()),
+    }
+    with dados["lock"]:
+        dados["amostras"].append(amostra)
+
+
+def show():
+    import pandas as pd
+    from pympler import muppy, summary
+
+    st.write("# Memória")
+
+    # Função para medir cada chave do session_state desta sessão
+    def carregar_sessao_atual():
+        linhas = [(str(k), type(v).__name__, tamanho(v)) for k, v in st.session_state.items()]
+        df = pd.DataFrame(linhas, columns=["chave", "tipo", "bytes"])
+        return df.sort_values("bytes", ascending=False)
+
+    st.write("## Esta sessão")
+    df_sessao = carregar_sessao_atual()
+    st.metric("session_state", formatar_bytes(int(df_sessao["bytes"].sum())), help=f"{len(df_sessao)} chave(s)")
+    st.dataframe(df_sessao, hide_index=True, use_container_width=True)
+
+    if st.button("Podar chaves temporárias desta sessão", key="podar_chaves"):
+        removidas = podar_chaves()
+        st.toast(f"{len(removidas)} chave(s) removida(s).")
+        st.rerun()
+
+    st.write("## Sessões ativas")
+    estados = estados_das_sessoes()
+    if not estados:
+        st.write("Não foi possível listar as sessões do servidor.")
+    else:
+        df_sessoes = pd.DataFrame(
+            [(id_sessao[:8], len(estado), tamanho(estado)) for id_sessao, estado in estados.items()],
+            columns=["sessão", "chaves", "bytes"],
+        ).sort_values("bytes", ascending=False)
+        st.metric("Total das sessões", formatar_bytes(int(df_sessoes["bytes"].sum())), help=f"{len(df_sessoes)} sessão(ões)")
+        st.dataframe(df_sessoes, hide_index=True, use_container_width=True)
+
+    st.write("## Caches de dados")
+    df_caches = pd.DataFrame(entradas_caches(), columns=["cache", "bytes"])
+    if not df_caches.empty:
+        df_caches = (
+            df_caches.groupby("cache", as_index=False)
+            .agg(entradas=("bytes", "size"), bytes=("bytes", "sum"))
+            .sort_values("bytes", ascending=False)
+        )
+    if df_caches.empty:
+        st.write("Nenhuma entrada nos caches.")
+    else:
+        st.metric("Total dos caches", formatar_bytes(int(df_caches["bytes"].sum())))
+        st.dataframe(df_caches, hide_index=True, use_container_width=True)
+
+    st.write("## Evolução")
+    if st.button("Registrar amostra agora", key="registrar_amostra"):
+        registrar_amostra(historico())
+    with historico()["lock"]:
+        amostras = list(historico()["amostras"])
+    if len(amostras) < 2:
+        st.write(f"Amostras são registradas a cada {INTERVALO_AMOSTRA_SEGUNDOS} segundos.")
+    else:
+        df_historico = pd.DataFrame(amostras).set_index("hora")
+        st.line_chart(df_historico[["session_state", "caches"]] / (1024 * 1024), y_label="MB")
+
+    st.write("## Processo")
+    # Percorre todos os objetos do interpretador: pode levar alguns segundos
+    if st.button("Resumo dos objetos do processo por tipo", key="resumo_processo"):
+        linhas = summary.summarize(muppy.get_objects())
+        df_tipos = pd.DataFrame(linhas, columns=["tipo", "objetos", "bytes"]).sort_values("bytes", ascending=False)
+        st.dataframe(df_tipos.head(25), hide_index=True, use_container_width=True)
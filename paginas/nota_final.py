@@ -0,0 +1,83 @@
+# paginas/nota_final.py
+#
+# Fórmula da nota final de uma equipe, em um só lugar: média dos critérios por
+# jurado, média dos jurados gerais, soma dos especialistas, tudo dividido por
+# (E + 1), onde E é o número de especialistas que votaram. Só contam as notas
+# 'ok'; equipes sem nenhuma ficam com 0.
+#
+# A Classificação, a exportação e o teste de carga usam as consultas daqui; o
+# arquivo do ano (paginas/arquivamento.py), que não tem banco, usa
+# calcular_em_pandas(): ao mudar a fórmula, mude as duas versões juntas.
+# ferramentas/verificar_classificacao.py confere as duas contra a fórmula em
+# Python que a página usava antes.
+
+
+# CTEs medias_jurados e notas_equipes (id_equipe, media_geral, soma_especialistas,
+# qtd_especialistas) sobre as notas que passam no filtro (alias n para tbl_notas)
+def cte_notas_equipes(filtro):
+    return f"""
+        medias_jurados AS (
+            SELECT
+                n.id_equipe,
+                n.id_jurado,
+                AVG(n.nota) AS media,
+                EXISTS (
+                    SELECT 1 FROM tbl_especialistas e
+                    WHERE e.id_jurado = n.id_jurado
+                      AND e.id_ano = n.id_ano
+                      AND e.id_modalidade = n.id_modalidade
+                ) AS especialista
+            FROM tbl_notas n
+            WHERE {filtro}
+              AND n.status = 'ok'
+            GROUP BY n.id_equipe, n.id_jurado, n.id_ano, n.id_modalidade
+        ),
+        notas_equipes AS (
+            SELECT
+                id_equipe,
+                COALESCE(AVG(media) FILTER (WHERE NOT especialista), 0) AS media_geral,
+                COALESCE(SUM(media) FILTER (WHERE especialista), 0) AS soma_especialistas,
+                COUNT(*) FILTER (WHERE especialista) AS qtd_especialistas
+            FROM medias_jurados
+            GROUP BY id_equipe
+        )
+    """
+
+
+# Nota final a partir de notas_equipes (alias ne, em LEFT JOIN com as equipes)
+EXPRESSAO_NOTA_FINAL = "COALESCE((ne.media_geral + ne.soma_especialistas) / (ne.qtd_especialistas + 1), 0)"
+
+# Notas finais das equipes de uma modalidade (parâmetros %(ano)s e %(modalidade)s):
+# id_equipe, nome, grau, nota_final
+QUERY_MODALIDADE = f"""
+    WITH {cte_notas_equipes("n.id_ano = %(ano)s AND n.id_modalidade = %(modalidade)s")}
+    SELECT
+        eq.id_equipe,
+        eq.nome,
+        eq.grau,
+        {EXPRESSAO_NOTA_FINAL} AS nota_final
+    FROM tbl_equipes eq
+    LEFT JOIN notas_equipes ne ON ne.id_equipe = eq.id_equipe
+    WHERE eq.id_modalidade = %(modalidade)s
+    ORDER BY eq.grau, eq.nome;
+"""
+
+
+# A mesma fórmula sobre DataFrames: notas (id_equipe, id_jurado, nota, só as 'ok')
+# e o conjunto de id_jurado especialistas da modalidade. Devolve {id_equipe: nota_final}
+# das equipes com notas; as demais ficam com 0.
+def calcular_em_pandas(notas, especialistas):
+    import pandas as pd
+
+    if notas.empty:
+        return {}
+    notas = notas.assign(nota=notas["nota"].astype(float))
+    medias = notas.groupby(["id_equipe", "id_jurado"], as_index=False)["nota"].mean()
+    medias["especialista"] = medias["id_jurado"].isin(especialistas)
+    gerais = medias[~medias["especialista"]].groupby("id_equipe")["nota"].mean()
+    soma_especialistas = medias[medias["especialista"]].groupby("id_equipe")["nota"].sum()
+    qtd_especialistas = medias[medias["especialista"]].groupby("id_equipe")["nota"].count()
+
+    finais = pd.DataFrame({"media_geral": gerais, "soma": soma_especialistas, "qtd": qtd_especialistas}).fillna(0)
+    finais["nota_final"] = (finais["media_geral"] + finais["soma"]) / (finais["qtd"] + 1)
+    return {int(id_equipe): float(nota) for id_equipe, nota in finais["nota_final"].items()}
@@ -0,0 +1,115 @@
+# paginas/notificacoes.py
+#
+# Ouvinte dos avisos de alteração de notas (migracoes/0006_notificacoes_notas.sql).
+# Uma única thread por processo mantém uma conexão própria com LISTEN no canal
+# notas_alteradas e conta, por equipe, quantos avisos chegaram. As páginas
+# comparam esse contador com o que tinham quando carregaram os dados: só as
+# equipes que mudaram são consultadas de novo.
+#
+# Se a conexão cair, os avisos do intervalo se perdem; ao reconectar a geração
+# muda e todas as equipes são tratadas como alteradas.
+#
+# ativo() só confia nos avisos quando os gatilhos da migração existem no banco e
+# a conexão respondeu há pouco: keepalives do TCP e um SELECT 1 a cada
+# INTERVALO_VERIFICACAO_SEGUNDOS sem avisos percebem conexões mortas em silêncio.
+
+import select
+import threading
+import time
+
+import psycopg2
+import streamlit as st
+from paginas import db
+
+CANAL = "notas_alteradas"
+ESPERA_RECONEXAO_SEGUNDOS = 5
+INTERVALO_VERIFICACAO_SEGUNDOS = 15
+
+
+class Ouvinte:
+    def __init__(self, db_url):
+        self._db_url = db_url
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._geracao = 0
+        self._ultimo_contato = None
+        self.conectado = False
+        self.gatilhos = False
+        threading.Thread(target=self._executar, name="ouvinte_notas", daemon=True).start()
+
+    # Versão das notas da equipe conhecida pelo processo: muda a cada aviso recebido
+    def versao(self, id_equipe):
+        with self._lock:
+            return self._geracao, self._contadores.get(int(id_equipe), 0)
+
+    # Avisos confiáveis: conexão aberta, gatilhos instalados e resposta recente do banco
+    def ativo(self):
+        contato = self._ultimo_contato
+        return (
+            self.conectado
+            and self.gatilhos
+            and contato is not None
+            and time.monotonic() - contato <= 2 * INTERVALO_VERIFICACAO_SEGUNDOS
+        )
+
+    def _contar_avisos(self, conn):
+        with self._lock:
+            while conn.notifies:
+                aviso = conn.notifies.pop(0)
+                if aviso.payload.isdigit():
+                    id_equipe = int(aviso.payload)
+                    self._contadores[id_equipe] = self._contadores.get(id_equipe, 0) + 1
+
+    def _executar(self):
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(
+                    self._db_url,
+                    connect_timeout=db.DB_CONNECT_TIMEOUT,
+                    keepalives=1,
+                    keepalives_idle=INTERVALO_VERIFICACAO_SEGUNDOS,
+                    keepalives_interval=5,
+                    keepalives_count=3,
+                )
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CANAL};")
+                    # Sem os gatilhos (migração 0006 não aplicada) nenhum aviso chegaria
+                    cursor.execute("SELECT 1 FROM pg_trigger WHERE tgname LIKE 'trg_notas_notifica_%' LIMIT 1;")
+                    self.gatilhos = cursor.fetchone() is not None
+                with self._lock:
+                    self._geracao += 1
+                self._ultimo_contato = time.monotonic()
+                self.conectado = True
+
+                while True:
+                    # Espera sem consumir CPU; sem avisos no intervalo, confirma que a conexão responde
+                    if select.select([conn], [], [], INTERVALO_VERIFICACAO_SEGUNDOS) == ([], [], []):
+                        with conn.cursor() as cursor:
+                            cursor.execute("SELECT 1;")
+                    conn.poll()
+                    self._ultimo_contato = time.monotonic()
+                    # Avisos que chegaram durante o SELECT 1 também já saíram do socket:
+                    # se não forem contados agora, só seriam vistos no próximo aviso
+                    self._contar_avisos(conn)
+            except Exception:
+                self.conectado = False
+                time.sleep(ESPERA_RECONEXAO_SEGUNDOS)
+            finally:
+                if conn is not None and not conn.closed:
+                    conn.close()
+
+
+# Um ouvinte por processo, compartilhado por todas as sessões
+@st.cache_resource(show_spinner=False)
+def ouvinte():
+    return Ouvinte(db.DB_URL)
+
+
+def versao_equipe(id_equipe):
+    return ouvinte().versao(id_equipe)
+
+
+def ativo():
+    return ouvinte().ativo()
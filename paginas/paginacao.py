@@ -0,0 +1,51 @@
+# paginas/paginacao.py
+#
+# Paginação por keyset: em vez de LIMIT/OFFSET, cada página começa depois da
+# última linha da anterior (WHERE (col, id) > (...) ORDER BY col, id LIMIT n).
+# Assim a página N custa o mesmo que a página 1, e a sessão guarda apenas a
+# pilha de cursores das páginas já visitadas.
+
+import streamlit as st
+
+TAMANHO_PAGINA = 50
+
+
+# Condição SQL "(c1, c2) > (%s, %s)" e seus parâmetros; sem cursor, não filtra nada
+def filtro_keyset(colunas, apos):
+    if apos is None:
+        return "TRUE", ()
+    marcadores = ", ".join(["%s"] * len(colunas))
+    return f"({', '.join(colunas)}) > ({marcadores})", tuple(apos)
+
+
+# Cursor de início da página atual (None na primeira página)
+def cursor_atual(chave):
+    return st.session_state.get(f"keyset_{chave}", [None])[-1]
+
+
+def numero_pagina(chave):
+    return len(st.session_state.get(f"keyset_{chave}", [None]))
+
+
+# O carregador busca tamanho + 1 linhas; a linha extra só indica que há uma próxima página
+def recortar(df, tamanho=TAMANHO_PAGINA):
+    return df.iloc[:tamanho], len(df) > tamanho
+
+
+# Botões Anterior/Próxima. colunas são as colunas do DataFrame que formam a chave de
+# ordenação, na mesma ordem usada no ORDER BY do carregador.
+def navegacao(chave, df, colunas, tem_proxima, escopo="app"):
+    cursores = st.session_state.setdefault(f"keyset_{chave}", [None])
+    if len(cursores) == 1 and not tem_proxima:
+        return
+
+    col_anterior, col_proxima, col_pagina = st.columns([1, 1, 4])
+    if col_anterior.button("Anterior", key=f"anterior_{chave}", disabled=len(cursores) == 1):
+        cursores.pop()
+        st.rerun(scope=escopo)
+    if col_proxima.button("Próxima", key=f"proxima_{chave}", disabled=not tem_proxima or df.empty):
+        ultima = df.iloc[-1]
+        # Valores nativos do Python (numpy.int64 não é adaptado pelo psycopg2)
+        cursores.append(tuple(v.item() if hasattr(v, "item") else v for v in (ultima[c] for c in colunas)))
+        st.rerun(scope=escopo)
+    col_pagina.caption(f"Página {len(cursores)}")
@@ -0,0 +1,59 @@
+# paginas/tabela.py
+#
+# Listagens dos cadastros como uma única tabela (st.dataframe) com seleção de
+# linhas, em vez de um st.columns e um botão "Apagar" por linha: o número de
+# widgets por execução não cresce com o tamanho da lista.
+
+import streamlit as st
+
+
+# Tabela com seleção de várias linhas; devolve os valores de coluna_id das linhas marcadas.
+# colunas mapeia o nome da coluna no DataFrame para o título exibido.
+#
+# A seleção chega como posições na tabela que o operador viu, mas o DataFrame é lido
+# de novo a cada execução: outra sessão pode ter incluído ou apagado linhas nesse
+# meio-tempo. Os ids exibidos ficam guardados (por versão da tabela) e as posições são
+# traduzidas por eles; se a lista mudou, a seleção é descartada em vez de apontar
+# para outras linhas.
+def tabela_selecionavel(df, chave, coluna_id, colunas):
+    if df.empty:
+        return []
+    versao = st.session_state.get(f"versao_tabela_{chave}", 0)
+    chave_ids = f"ids_tabela_{chave}_{versao}"
+    exibidos = st.session_state.get(chave_ids)
+    atuais = df[coluna_id].tolist()
+    st.session_state[chave_ids] = atuais
+
+    evento = st.dataframe(
+        df[list(colunas)].rename(columns=colunas),
+        hide_index=True,
+        use_container_width=True,
+        on_select="rerun",
+        selection_mode="multi-row",
+        key=f"tabela_{chave}_{versao}",
+    )
+    linhas = evento.selection.rows
+    if not linhas:
+        return []
+    if exibidos != atuais:
+        st.warning("A lista mudou desde que as linhas foram marcadas. Marque-as de novo.")
+        limpar_selecao(chave)
+        return []
+    return [exibidos[linha] for linha in linhas]
+
+
+# Descarta a seleção atual da tabela (as posições marcadas não valem mais depois de apagar)
+def limpar_selecao(chave):
+    versao = st.session_state.get(f"versao_tabela_{chave}", 0)
+    st.session_state.pop(f"ids_tabela_{chave}_{versao}", None)
+    st.session_state[f"versao_tabela_{chave}"] = versao + 1
+
+
+# Botão que apaga de uma vez as linhas selecionadas. apagar(selecionados) devolve True se
+# conseguiu; nesse caso a seleção é limpa e a página é atualizada.
+def botao_apagar_selecionados(chave, selecionados, apagar):
+    if st.button(f"Apagar selecionados ({len(selecionados)})", key=f"apagar_selecionados_{chave}", disabled=not selecionados):
+        # Seleção descartada nesta execução (a lista mudou): não apaga nada
+        if selecionados and apagar(selecionados):
+            limpar_selecao(chave)
+            st.rerun()
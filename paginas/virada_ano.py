@@ -0,0 +1,81 @@
+# paginas/virada_ano.py
+#
+# Preparação de uma nova edição: copia a estrutura de um ano (modalidades,
+# critérios, jurados e especialistas) para outro com um INSERT ... SELECT por
+# tabela, todos na mesma transação. Os ids novos são encontrados pelas chaves
+# naturais (nome da modalidade no ano, login do jurado), sem ida e volta de
+# ids entre o banco e a página.
+
+from paginas import catalogo, db
+
+# O login do jurado é único no banco inteiro: a cópia recebe o sufixo _<ano>.
+# Um sufixo de ano anterior (_<origem>) é trocado, não acumulado.
+LOGIN_NOVO = (
+    "LEFT(regexp_replace({coluna}, '_' || %(origem)s || '$', ''), 50 - LENGTH('_' || %(destino)s))"
+    " || '_' || %(destino)s"
+)
+
+COPIAR_MODALIDADES = """
+    INSERT INTO tbl_modalidades (nome, id_ano)
+    SELECT nome, %(destino)s
+    FROM tbl_modalidades
+    WHERE id_ano = %(origem)s
+    ON CONFLICT (nome, id_ano) DO NOTHING;
+"""
+
+COPIAR_CRITERIOS = """
+    INSERT INTO tbl_criterios (nome, id_modalidade)
+    SELECT c.nome, mn.id_modalidade
+    FROM tbl_criterios c
+    JOIN tbl_modalidades mo ON mo.id_modalidade = c.id_modalidade AND mo.id_ano = %(origem)s
+    JOIN tbl_modalidades mn ON mn.nome = mo.nome AND mn.id_ano = %(destino)s
+    ON CONFLICT (nome, id_modalidade) DO NOTHING;
+"""
+
+COPIAR_JURADOS = f"""
+    INSERT INTO tbl_jurados (nome, login, senha, id_ano)
+    SELECT nome, {LOGIN_NOVO.format(coluna="login")}, senha, %(destino)s
+    FROM tbl_jurados
+    WHERE id_ano = %(origem)s
+    ON CONFLICT (login) DO NOTHING;
+"""
+
+COPIAR_ESPECIALISTAS = f"""
+    INSERT INTO tbl_especialistas (id_ano, id_jurado, id_modalidade)
+    SELECT %(destino)s, jn.id_jurado, mn.id_modalidade
+    FROM tbl_especialistas e
+    JOIN tbl_jurados jo ON jo.id_jurado = e.id_jurado
+    JOIN tbl_jurados jn ON jn.login = {LOGIN_NOVO.format(coluna="jo.login")} AND jn.id_ano = %(destino)s
+    JOIN tbl_modalidades mo ON mo.id_modalidade = e.id_modalidade
+    JOIN tbl_modalidades mn ON mn.nome = mo.nome AND mn.id_ano = %(destino)s
+    WHERE e.id_ano = %(origem)s
+    ON CONFLICT DO NOTHING;
+"""
+
+
+# Copia a estrutura de origem para destino (criando o ano destino se preciso).
+# Devolve a quantidade de linhas inseridas por tabela; o que já existia no destino é mantido.
+def copiar_estrutura(origem, destino):
+    origem, destino = int(origem), int(destino)
+    if origem == destino:
+        raise ValueError("O ano de destino deve ser diferente do ano de origem.")
+
+    params = {"origem": origem, "destino": destino}
+    totais = {}
+    with db.get_cursor() as cursor:
+        cursor.execute("SELECT 1 FROM tbl_anos WHERE id_ano = %s;", (origem,))
+        if not cursor.fetchone():
+            raise ValueError(f"O ano {origem} não existe no banco.")
+        cursor.execute("INSERT INTO tbl_anos (id_ano) VALUES (%s) ON CONFLICT DO NOTHING;", (destino,))
+
+        for tabela, query in [
+            ("modalidades", COPIAR_MODALIDADES),
+            ("criterios", COPIAR_CRITERIOS),
+            ("jurados", COPIAR_JURADOS),
+            ("especialistas", COPIAR_ESPECIALISTAS),
+        ]:
+            cursor.execute(query, params)
+            totais[tabela] = cursor.rowcount
+
+    catalogo.invalidar_anos()
+    return totais